@@ -6,27 +6,159 @@ Downloads DJ tracks from Spotify playlists via Telegram bot.
 Only downloads tracks not already in your library.
 """
 
+import os
 import sys
 import asyncio
-import argparse
 from pathlib import Path
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional
 
-from dotenv import load_dotenv
-from colorama import init as colorama_init, Fore, Style
+if TYPE_CHECKING:
+    import argparse
 
-load_dotenv()
-colorama_init()
+
+class _NoColor:
+    """Stand-in for colorama's Fore/Style when color output is disabled"""
+
+    def __getattr__(self, name: str) -> str:
+        return ''
+
+
+# Replaced by colorama in _init_colors() when writing to a terminal
+Fore = Style = _NoColor()
+
+_VERSION = "3.0.0"
+_RULE = '=' * 50
+
+
+def _build_banner(color: str = '', reset: str = '') -> str:
+    return f"\n{color}{_RULE}\n  Spotify DJ Track Automation v{_VERSION}\n{_RULE}{reset}\n\n"
+
+
+# Fixed escape sequences, rebuilt once by _init_colors()
+_BANNER = _build_banner()
+_RED = _RST = ''
+_COLOR_ENABLED = False
+
+
+def _init_colors() -> None:
+    """Import colorama only when stdout is a color terminal"""
+    global Fore, Style, _BANNER, _RED, _RST, _COLOR_ENABLED
+
+    if os.getenv('NO_COLOR') or not sys.stdout.isatty():
+        return
+
+    # POSIX terminals understand ANSI natively; this only patches Windows consoles
+    from colorama import just_fix_windows_console, Fore, Style
+    just_fix_windows_console()
+
+    _BANNER = _build_banner(Fore.CYAN, Style.RESET_ALL)
+    _RED, _RST = Fore.RED, Style.RESET_ALL
+    _COLOR_ENABLED = True
+
+
+def _strip_module_colors() -> None:
+    """The src modules print colorama codes directly; strip them when color is off"""
+    if not _COLOR_ENABLED:
+        from colorama import init as colorama_init
+        colorama_init(strip=True)
 
 
 def print_banner():
     """Print application banner"""
-    print(f"\n{Fore.CYAN}{'='*50}")
-    print(f"  Spotify DJ Track Automation v3.0.0")
-    print(f"{'='*50}{Style.RESET_ALL}\n")
+    sys.stdout.write(_BANNER)
+
+
+def print_error(message: str):
+    """Print an error line in red"""
+    sys.stdout.write(f"{_RED}{message}{_RST}\n")
+
+
+_SPOTIFY_URL_PREFIX = 'https://open.spotify.com/'
+
+
+@dataclass(slots=True)
+class _DefaultArgs:
+    """Parsed arguments for the argparse-free path; keep defaults in sync with create_parser()"""
+    target: str
+    dry_run: bool = False
+    batch_size: Optional[int] = None
+    limit: Optional[int] = None
+    start_from: int = 1
+    debug: bool = False
+    sequential: bool = False
+    jobs: Optional[int] = None
+    yes: bool = False
+    version: bool = False
 
 
-def create_parser() -> argparse.ArgumentParser:
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be a whole number >= 1"""
+    import argparse
+
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+# Options understood by _fast_parse, mapped to their _DefaultArgs field
+_FAST_FLAGS = {
+    '--dry-run': 'dry_run',
+    '--debug': 'debug',
+    '--sequential': 'sequential',
+    '-y': 'yes',
+    '--yes': 'yes',
+}
+_FAST_INT_OPTIONS = {
+    '--batch-size': 'batch_size',
+    '--limit': 'limit',
+    '--start-from': 'start_from',
+    '--jobs': 'jobs',
+}
+
+
+def _fast_parse(argv: List[str]) -> Optional[_DefaultArgs]:
+    """
+    Single-pass parse of the common "<target> [options]" invocations.
+
+    Returns None for anything it does not fully understand (help, --version,
+    --opt=value, bad values, unknown tokens, missing target) so the caller
+    falls back to argparse for the full behavior and error messages.
+    """
+    target = None
+    values = {}
+    tokens = iter(argv)
+    for token in tokens:
+        field = _FAST_FLAGS.get(token)
+        if field:
+            values[field] = True
+            continue
+
+        field = _FAST_INT_OPTIONS.get(token)
+        if field:
+            value = next(tokens, '')
+            if not value.isdecimal() or int(value) < 1:
+                return None
+            values[field] = int(value)
+            continue
+
+        if token.startswith('-') or target is not None:
+            return None
+        target = token
+
+    if target is None:
+        return None
+    return _DefaultArgs(target=target, **values)
+
+
+def create_parser() -> 'argparse.ArgumentParser':
     """Create argument parser with simplified flags"""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Download missing tracks from Spotify playlists via Telegram bot",
         add_help=True,
@@ -40,16 +172,20 @@ def create_parser() -> argparse.ArgumentParser:
 
     parser.add_argument('--dry-run', action='store_true',
                         help='Preview tracks without downloading')
-    parser.add_argument('--batch-size', type=int, default=None,
+    parser.add_argument('--batch-size', type=_positive_int, default=None,
                         help='Tracks per batch (default: 3)')
-    parser.add_argument('--limit', type=int, default=None,
+    parser.add_argument('--limit', type=_positive_int, default=None,
                         help='Maximum number of tracks to process')
-    parser.add_argument('--start-from', type=int, default=1,
+    parser.add_argument('--start-from', type=_positive_int, default=1,
                         help='Start from track N (1-indexed)')
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug output')
     parser.add_argument('--sequential', action='store_true',
                         help='Process tracks one at a time')
+    parser.add_argument('--jobs', type=_positive_int, default=None,
+                        help='Threads reading tags during catalog scan (default: 4)')
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help='Answer yes to resume/confirmation prompts')
     parser.add_argument('--version', action='store_true',
                         help='Show version')
 
@@ -58,18 +194,23 @@ def create_parser() -> argparse.ArgumentParser:
 
 async def handle_download(args):
     """Handle playlist download — only downloads missing tracks"""
-    from src.downloader import SpotifyDownloader, DownloadConfig
+    from src.config import DownloadConfig
+    from src.downloader import SpotifyDownloader
+
+    _strip_module_colors()
 
     try:
-        config = DownloadConfig.from_env()
+        # Dry runs never reach Telegram, so only Spotify credentials are checked
+        config = DownloadConfig.from_env(dry_run=args.dry_run)
     except ValueError as e:
-        print(f"{Fore.RED}Configuration error: {e}{Style.RESET_ALL}")
+        print_error(f"Configuration error: {e}")
         sys.exit(1)
 
     downloader = SpotifyDownloader(config)
 
     try:
-        await downloader.initialize()
+        if not args.dry_run:
+            await downloader.initialize()
 
         if args.debug:
             downloader.set_debug_mode(True)
@@ -81,13 +222,14 @@ async def handle_download(args):
             limit=args.limit,
             sequential=args.sequential,
             start_from=args.start_from,
+            assume_yes=args.yes,
         )
 
         # Print summary
         if result and not args.dry_run:
-            print(f"\n{Fore.GREEN}{'='*50}")
+            print(f"\n{Fore.GREEN}{_RULE}")
             print(f"  Download Complete")
-            print(f"{'='*50}{Style.RESET_ALL}")
+            print(f"{_RULE}{Style.RESET_ALL}")
             downloaded = result.get('downloaded', 0)
             failed = result.get('failed', 0)
             skipped = result.get('skipped', 0)
@@ -104,16 +246,13 @@ async def handle_download(args):
 
 async def handle_status(args):
     """Show current session status"""
-    from src.downloader import SpotifyDownloader, DownloadConfig
-
-    try:
-        config = DownloadConfig.from_env()
-    except ValueError as e:
-        print(f"{Fore.RED}Configuration error: {e}{Style.RESET_ALL}")
-        sys.exit(1)
+    from src.config import DownloadConfig
+    from src.progress_tracker import create_progress_tracker
 
-    downloader = SpotifyDownloader(config)
-    status = downloader.get_status()
+    config = DownloadConfig.minimal()
+    tracker = create_progress_tracker(config.progress_file)
+    tracker.load_session()
+    status = tracker.get_session_stats()
 
     if not status:
         print(f"{Fore.YELLOW}No active session found.{Style.RESET_ALL}")
@@ -123,75 +262,96 @@ async def handle_status(args):
     for key, value in status.items():
         print(f"  {key}: {value}")
 
+    if tracker.failures_file.exists():
+        print(f"  failure_log: {tracker.failures_file}")
+
 
 async def handle_reset(args):
     """Reset current session"""
-    from src.downloader import SpotifyDownloader, DownloadConfig
+    from src.config import DownloadConfig
+    from src.progress_tracker import create_progress_tracker
 
-    try:
-        config = DownloadConfig.from_env()
-    except ValueError as e:
-        print(f"{Fore.RED}Configuration error: {e}{Style.RESET_ALL}")
-        sys.exit(1)
-
-    downloader = SpotifyDownloader(config)
-    downloader.reset_progress()
+    config = DownloadConfig.minimal()
+    create_progress_tracker(config.progress_file).reset_progress()
     print(f"{Fore.GREEN}Session reset successfully.{Style.RESET_ALL}")
 
 
 async def handle_catalog(args):
     """Rebuild catalog from music library on disk"""
     from src.catalog import LibraryCatalog
-    from src.downloader import DownloadConfig
+    from src.constants import CatalogConstants
+    from src.config import DownloadConfig
 
-    try:
-        config = DownloadConfig.from_env()
-    except ValueError as e:
-        print(f"{Fore.RED}Configuration error: {e}{Style.RESET_ALL}")
-        sys.exit(1)
+    config = DownloadConfig.minimal()
 
     library_path = config.music_library_path
     if not Path(library_path).exists():
-        print(f"{Fore.RED}Music library path not found: {library_path}{Style.RESET_ALL}")
+        print_error(f"Music library path not found: {library_path}")
         sys.exit(1)
 
     print(f"Scanning music library: {library_path}")
 
     catalog = LibraryCatalog()
-    added, errors = catalog.scan_library(Path(library_path))
+    jobs = args.jobs or CatalogConstants.DEFAULT_SCAN_JOBS
+    added, errors = catalog.scan_library(Path(library_path), jobs=jobs)
     print(f"\n{Fore.GREEN}Catalog rebuilt:{Style.RESET_ALL}")
     print(f"  Tracks indexed: {added}")
     print(f"  Errors: {errors}")
 
 
+# Named commands; any other target is treated as a Spotify URL
+COMMANDS = {
+    'status': handle_status,
+    'reset': handle_reset,
+    'catalog': handle_catalog,
+}
+
+
 async def main():
     """Main entry point"""
+    # --version on its own needs neither argparse nor the parser
+    if sys.argv[1:] == ['--version']:
+        print(f"spotify-downloader v{_VERSION}")
+        return
+
+    # Common invocations are parsed by hand; argparse is only built when needed
+    args = _fast_parse(sys.argv[1:])
+    if args:
+        handler = COMMANDS.get(args.target)
+        if not handler and args.target.startswith(_SPOTIFY_URL_PREFIX):
+            handler = handle_download
+        if handler:
+            _init_colors()
+            print_banner()
+            await handler(args)
+            return
+
     parser = create_parser()
     args = parser.parse_args()
 
     if args.version:
-        print("spotify-downloader v3.0.0")
+        print(f"spotify-downloader v{_VERSION}")
         return
 
     if not args.target:
         parser.print_help()
         return
 
+    _init_colors()
     print_banner()
 
     # Route to handler
-    if args.target == 'status':
-        await handle_status(args)
-    elif args.target == 'reset':
-        await handle_reset(args)
-    elif args.target == 'catalog':
-        await handle_catalog(args)
+    handler = COMMANDS.get(args.target)
+    if handler:
+        await handler(args)
     elif args.target.startswith('http'):
         await handle_download(args)
     else:
-        print(f"{Fore.RED}Unknown command or invalid URL: {args.target}{Style.RESET_ALL}")
+        print_error(f"Unknown command or invalid URL: {args.target}")
         parser.print_help()
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    # Runs on uvloop/winloop when installed, otherwise the default asyncio loop
+    from src.utils import run_async
+    run_async(main())
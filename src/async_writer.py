@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Async Writer Module
+
+Background writer for files that are rewritten as a whole, such as the
+progress file:
+- Callers hand over the serialized bytes and return immediately
+- A single daemon thread does the atomic, fsynced write
+- Only the latest snapshot is kept; older unwritten ones are dropped
+"""
+
+import atexit
+import threading
+from typing import Callable, Optional
+
+from .utils import atomic_write_bytes
+
+
+class AsyncArtifactWriter:
+    """
+    Writes the latest submitted snapshot of one file from a background thread.
+
+    Submitting while a write is in progress replaces any snapshot still
+    waiting, so a burst of saves costs at most two writes. flush() blocks
+    until everything submitted so far is on disk.
+    """
+
+    def __init__(self, path: str, on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Args:
+            path: File replaced by every write
+            on_error: Called from the writer thread when a write fails
+        """
+        self.path = path
+        self.on_error = on_error
+
+        self._pending: Optional[bytes] = None
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+        self._thread.start()
+        # The thread is a daemon; make sure queued data still lands on exit
+        atexit.register(self.close)
+
+    def submit(self, data: bytes) -> None:
+        """Queue the file's complete new contents, replacing any unwritten snapshot"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            self._pending = data
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Wait until every submitted snapshot has been written"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending is None and not self._writing)
+
+    def close(self) -> None:
+        """Write anything pending, then stop the thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                data, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                atomic_write_bytes(self.path, data)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
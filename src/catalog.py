@@ -16,6 +16,11 @@ from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from .constants import CatalogConstants
+from .utils import scan_audio_files
 
 try:
     from mutagen import File as MutagenFile
@@ -289,9 +294,13 @@ class LibraryCatalog:
             return False
     
     def scan_library(self, library_path: Path, playlist_name: Optional[str] = None,
-                    file_extensions: Optional[List[str]] = None) -> Tuple[int, int]:
+                    file_extensions: Optional[List[str]] = None,
+                    jobs: int = CatalogConstants.DEFAULT_SCAN_JOBS) -> Tuple[int, int]:
         """
         Scan library directory and add all audio files to catalog
+
+        Tag reading is spread over ``jobs`` threads (it is dominated by file
+        I/O); database writes stay on the calling thread.
         Returns: (added_count, error_count)
         """
         if file_extensions is None:
@@ -300,9 +309,16 @@ class LibraryCatalog:
         added_count = 0
         error_count = 0
         
-        # Recursively find all audio files
-        for ext in file_extensions:
-            for file_path in library_path.rglob(f"*{ext}"):
+        # Recursively find all audio files in a single directory walk
+        file_paths = [Path(p) for p in scan_audio_files(str(library_path), file_extensions)]
+
+        executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        try:
+            # None means add_track extracts metadata itself
+            metadata_results = (executor.map(self._extract_metadata_safe, file_paths)
+                                if executor else repeat(None))
+
+            for file_path, metadata in zip(file_paths, metadata_results):
                 try:
                     # Determine playlist source from directory structure
                     source = playlist_name
@@ -311,17 +327,27 @@ class LibraryCatalog:
                         parent_dir = file_path.parent.name
                         if parent_dir not in ['downloads', 'music', '.']:
                             source = parent_dir
-                    
-                    if self.add_track(file_path, source):
+
+                    if self.add_track(file_path, source, metadata_override=metadata):
                         added_count += 1
                     else:
                         error_count += 1
-                        
+
                 except Exception as e:
                     print(f"Error scanning {file_path}: {e}")
                     error_count += 1
-        
+        finally:
+            if executor:
+                executor.shutdown()
+
         return added_count, error_count
+
+    def _extract_metadata_safe(self, file_path: Path) -> Optional[Dict]:
+        """extract_metadata for worker threads; None lets add_track retry inline"""
+        try:
+            return self.extract_metadata(file_path)
+        except Exception:
+            return None
     
     def find_track(self, title: str, artist: str) -> Optional[CatalogTrack]:
         """Find a track by title and artist"""
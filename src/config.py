@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Configuration Module
+
+Holds DownloadConfig and its environment loading. Kept free of Spotify and
+Telegram SDK imports so lightweight commands (status, reset, catalog) can
+load configuration without paying for them.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping
+
+from dotenv import load_dotenv
+
+from .constants import Defaults, EnvVars
+
+
+_env_loaded = False
+
+
+def _load_env_once() -> None:
+    """Read .env into the process environment the first time it is needed"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+@dataclass
+class DownloadConfig:
+    """Configuration for download operations"""
+    # Spotify settings
+    spotify_client_id: str
+    spotify_client_secret: str
+
+    # Telegram settings
+    telegram_api_id: int
+    telegram_api_hash: str
+    telegram_phone_number: str
+    external_bot_username: str
+
+    # Download settings
+    download_folder: str = Defaults.DOWNLOAD_FOLDER
+    music_library_path: str = Defaults.MUSIC_LIBRARY_PATH
+    delay_between_requests: float = Defaults.DELAY_BETWEEN_REQUESTS
+    max_retries: int = Defaults.MAX_RETRIES
+    batch_size: int = 3
+    response_timeout: int = Defaults.RESPONSE_TIMEOUT
+
+    # File organization
+    organize_by_artist: bool = True
+    organize_by_album: bool = False
+    create_year_folders: bool = False
+
+    # Session management
+    progress_file: str = Defaults.PROGRESS_FILE
+    session_dir: str = Defaults.SESSION_DIR
+
+    @classmethod
+    def _validate_env_var(cls, name: str, value: str, min_length: int = 1) -> str:
+        """Validate environment variable is not empty"""
+        if not value or len(value.strip()) < min_length:
+            raise ValueError(f"{name} is empty or too short (minimum {min_length} characters)")
+        return value.strip()
+
+    @classmethod
+    def _validate_numeric(cls, name: str, value: str, min_val: float = 0,
+                          max_val: float = None, is_int: bool = False) -> float:
+        """Validate numeric environment variable"""
+        try:
+            num_value = int(value) if is_int else float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a valid {'integer' if is_int else 'number'}, got: {value}")
+
+        if num_value < min_val:
+            raise ValueError(f"{name} must be at least {min_val}, got: {num_value}")
+        if max_val is not None and num_value > max_val:
+            raise ValueError(f"{name} must be at most {max_val}, got: {num_value}")
+
+        return num_value
+
+    @staticmethod
+    def _local_paths(env: Mapping[str, str]) -> Dict[str, str]:
+        """Download and library folders, shared by every way of building a config"""
+        return {
+            'download_folder': env.get(EnvVars.DOWNLOAD_FOLDER, Defaults.DOWNLOAD_FOLDER),
+            'music_library_path': env.get(EnvVars.MUSIC_LIBRARY_PATH, Defaults.MUSIC_LIBRARY_PATH),
+        }
+
+    @classmethod
+    def minimal(cls) -> 'DownloadConfig':
+        """
+        Create config with only local paths, for commands that never talk
+        to Spotify or Telegram (status, reset, catalog).
+
+        Returns:
+            DownloadConfig with empty credentials
+        """
+        _load_env_once()
+
+        return cls(
+            spotify_client_id='',
+            spotify_client_secret='',
+            telegram_api_id=0,
+            telegram_api_hash='',
+            telegram_phone_number='',
+            external_bot_username='',
+            **cls._local_paths(os.environ),
+        )
+
+    @classmethod
+    def from_env(cls, dry_run: bool = False) -> 'DownloadConfig':
+        """
+        Create config from environment variables with validation.
+
+        Args:
+            dry_run: If True, only Spotify credentials are required
+
+        Returns:
+            Validated DownloadConfig instance
+
+        Raises:
+            ValueError: If required variables are missing or invalid
+        """
+        _load_env_once()
+
+        # Read live, so later changes to os.environ are picked up; nothing
+        # below writes to it
+        env = os.environ
+
+        def require(name: str) -> str:
+            value = env.get(name, '').strip()
+            if not value:
+                raise ValueError(f"Missing required variable: {name}")
+            return value
+
+        # Validate and get Spotify credentials (always required)
+        spotify_client_id = require(EnvVars.SPOTIFY_CLIENT_ID)
+        spotify_client_secret = require(EnvVars.SPOTIFY_CLIENT_SECRET)
+
+        # Validate Spotify credentials format
+        cls._validate_env_var(EnvVars.SPOTIFY_CLIENT_ID, spotify_client_id, min_length=10)
+        cls._validate_env_var(EnvVars.SPOTIFY_CLIENT_SECRET, spotify_client_secret, min_length=10)
+
+        # Settings shared by dry and real runs; optional numerics are validated
+        settings = cls._local_paths(env)
+        settings['delay_between_requests'] = cls._validate_numeric(
+            EnvVars.DELAY_BETWEEN_REQUESTS,
+            env.get(EnvVars.DELAY_BETWEEN_REQUESTS, str(Defaults.DELAY_BETWEEN_REQUESTS)),
+            min_val=0, max_val=3600
+        )
+        settings['max_retries'] = int(cls._validate_numeric(
+            EnvVars.MAX_RETRIES,
+            env.get(EnvVars.MAX_RETRIES, str(Defaults.MAX_RETRIES)),
+            min_val=1, max_val=10, is_int=True
+        ))
+        settings['response_timeout'] = int(cls._validate_numeric(
+            EnvVars.RESPONSE_TIMEOUT,
+            env.get(EnvVars.RESPONSE_TIMEOUT, str(Defaults.RESPONSE_TIMEOUT)),
+            min_val=30, max_val=3600, is_int=True
+        ))
+
+        if dry_run:
+            # Dry runs never reach Telegram; use dummy values
+            telegram = {
+                'telegram_api_id': 12345,
+                'telegram_api_hash': "dummy_hash",
+                'telegram_phone_number': "+1234567890",
+                'external_bot_username': "@dummy_bot",
+            }
+        else:
+            telegram = cls._telegram_from_env(require)
+
+        return cls(
+            spotify_client_id=spotify_client_id,
+            spotify_client_secret=spotify_client_secret,
+            **telegram,
+            **settings,
+        )
+
+    @classmethod
+    def _telegram_from_env(cls, require: Callable[[str], str]) -> Dict[str, Any]:
+        """Read and validate the Telegram credentials needed for a real run"""
+        telegram_api_id_str = require(EnvVars.TELEGRAM_API_ID)
+        telegram_api_hash = require(EnvVars.TELEGRAM_API_HASH)
+        telegram_phone = require(EnvVars.TELEGRAM_PHONE_NUMBER)
+        bot_username = require(EnvVars.EXTERNAL_BOT_USERNAME)
+
+        # Validate Telegram API ID is a valid integer
+        try:
+            telegram_api_id = int(telegram_api_id_str)
+        except ValueError:
+            raise ValueError(f"{EnvVars.TELEGRAM_API_ID} must be a valid integer")
+
+        # Validate Telegram API hash format
+        cls._validate_env_var(EnvVars.TELEGRAM_API_HASH, telegram_api_hash, min_length=20)
+
+        # Validate phone number format (basic check)
+        if not telegram_phone.startswith('+'):
+            raise ValueError(f"{EnvVars.TELEGRAM_PHONE_NUMBER} must start with '+' and include country code")
+
+        return {
+            'telegram_api_id': telegram_api_id,
+            'telegram_api_hash': telegram_api_hash,
+            'telegram_phone_number': telegram_phone,
+            'external_bot_username': bot_username,
+        }
@@ -33,6 +33,18 @@ class TelegramConstants:
     # Multiplier for flood wait time
     FLOOD_WAIT_MULTIPLIER: float = 1.5
 
+    # Repeated flood waits scale by the square of the streak, which stops
+    # growing here (at most 9x the server's wait)
+    FLOOD_WAIT_MAX_STREAK: int = 3
+
+    # Pause before retrying a send that failed with a non-flood error (seconds);
+    # doubles per attempt, with jitter, up to SEND_RETRY_BACKOFF_MAX
+    SEND_RETRY_BACKOFF: float = 5.0
+    SEND_RETRY_BACKOFF_MAX: float = 60.0
+
+    # Part size for file downloads (KB); Telegram allows up to 512 for GetFile
+    DOWNLOAD_PART_SIZE_KB: int = 512
+
 
 class CatalogConstants:
     """Constants related to catalog operations"""
@@ -46,6 +58,9 @@ class CatalogConstants:
     # Similarity threshold for fuzzy matching (percentage)
     FUZZY_MATCH_THRESHOLD: float = 90.0
 
+    # Default number of threads reading tags during a library scan
+    DEFAULT_SCAN_JOBS: int = 4
+
 
 class FileConstants:
     """Constants related to file operations"""
@@ -65,6 +80,9 @@ class FileConstants:
     # Invalid characters for filenames
     INVALID_FILENAME_CHARS: str = '<>:"/\\|?*'
 
+    # Threads moving and cataloging downloaded files
+    IO_WORKERS: int = 4
+
 
 class BatchConstants:
     """Constants related to batch processing"""
@@ -72,6 +90,17 @@ class BatchConstants:
     # Default batch size for processing tracks
     DEFAULT_BATCH_SIZE: int = 3
 
+    # Sends allowed in flight at once within a batch. Messages are still
+    # spaced by the delay between requests; this only overlaps round-trips
+    MAX_CONCURRENT_SENDS: int = 3
+
+    # Successful sends needed to allow one more concurrent send after a flood
+    # wait halved the limit; never grows past MAX_CONCURRENT_SENDS
+    SEND_RECOVERY_SUCCESSES: int = 10
+
+    # Files downloaded from Telegram at once when bot responses arrive in a burst
+    MAX_CONCURRENT_DOWNLOADS: int = 3
+
     # Default batch timeout (seconds) - 5 minutes per batch
     # This is the time to wait before moving to next batch, not a hard failure
     DEFAULT_BATCH_TIMEOUT: int = 300
@@ -83,11 +112,12 @@ class BatchConstants:
     # e.g., batch of 5 tracks = 5 * 60 = 300 seconds minimum
     MIN_TIMEOUT_PER_TRACK: int = 60
 
-    # Interval for checking batch completion (seconds)
-    BATCH_CHECK_INTERVAL: int = 5
+    # Seconds a sent track may wait for the bot to start sending its file
+    # before its window slot goes to the next track
+    WINDOW_STALE_TIMEOUT: int = 60
 
-    # Interval for checking individual track completion (seconds)
-    TRACK_CHECK_INTERVAL: int = 2
+    # Interval between progress file writes while tracks are processing (seconds)
+    PROGRESS_FLUSH_INTERVAL: float = 2.0
 
 
 class DisplayConstants:
@@ -102,6 +132,9 @@ class DisplayConstants:
     # Maximum missing tracks to show in list
     MAX_MISSING_TRACKS_DISPLAY: int = 10
 
+    # Minimum seconds between download progress updates
+    PROGRESS_UPDATE_INTERVAL: float = 0.25
+
 
 class MatchingWeights:
     """Weights for track matching algorithm"""
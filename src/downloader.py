@@ -10,186 +10,25 @@ Coordinates all components to provide the complete download workflow:
 """
 
 import asyncio
-import os
 import sys
 import time
-from pathlib import Path
-from typing import Optional, List, Dict, Callable
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Dict, Callable, Set, Tuple
 
-from colorama import init, Fore, Style
-from dotenv import load_dotenv
+from colorama import Fore, Style
 
 from .spotify_api import SpotifyExtractor, Track, create_spotify_extractor
-from .utils import clear_print
-from .constants import Defaults, EnvVars, BatchConstants
+from .utils import ainput, clear_print, queued_stdout, run_async
+from .config import DownloadConfig
+from .constants import BatchConstants, FileConstants
+from .rate_limiter import AdjustableSemaphore
 from .telegram_client import TelegramMessenger, TelegramConfig, create_telegram_messenger
 from .file_manager import FileManager, FileConfig, create_file_manager
-from .progress_tracker import ProgressTracker, TrackStatus, create_progress_tracker
+from .progress_tracker import ProgressTracker, TrackProgress, TrackStatus, create_progress_tracker
 from .catalog import LibraryCatalog
 from .link_converter import LinkConverter
 
-# Initialize colorama
-init()
-
-
-@dataclass
-class DownloadConfig:
-    """Configuration for download operations"""
-    # Spotify settings
-    spotify_client_id: str
-    spotify_client_secret: str
-
-    # Telegram settings
-    telegram_api_id: int
-    telegram_api_hash: str
-    telegram_phone_number: str
-    external_bot_username: str
-
-    # Download settings
-    download_folder: str = Defaults.DOWNLOAD_FOLDER
-    music_library_path: str = Defaults.MUSIC_LIBRARY_PATH
-    delay_between_requests: float = Defaults.DELAY_BETWEEN_REQUESTS
-    max_retries: int = Defaults.MAX_RETRIES
-    batch_size: int = 3
-    response_timeout: int = Defaults.RESPONSE_TIMEOUT
-
-    # File organization
-    organize_by_artist: bool = True
-    organize_by_album: bool = False
-    create_year_folders: bool = False
-
-    # Session management
-    progress_file: str = Defaults.PROGRESS_FILE
-    session_dir: str = Defaults.SESSION_DIR
-
-    @classmethod
-    def _validate_env_var(cls, name: str, value: str, min_length: int = 1) -> str:
-        """Validate environment variable is not empty"""
-        if not value or len(value.strip()) < min_length:
-            raise ValueError(f"{name} is empty or too short (minimum {min_length} characters)")
-        return value.strip()
-
-    @classmethod
-    def _validate_numeric(cls, name: str, value: str, min_val: float = 0,
-                          max_val: float = None, is_int: bool = False) -> float:
-        """Validate numeric environment variable"""
-        try:
-            num_value = int(value) if is_int else float(value)
-        except ValueError:
-            raise ValueError(f"{name} must be a valid {'integer' if is_int else 'number'}, got: {value}")
-
-        if num_value < min_val:
-            raise ValueError(f"{name} must be at least {min_val}, got: {num_value}")
-        if max_val is not None and num_value > max_val:
-            raise ValueError(f"{name} must be at most {max_val}, got: {num_value}")
-
-        return num_value
-
-    @classmethod
-    def from_env(cls, dry_run: bool = False) -> 'DownloadConfig':
-        """
-        Create config from environment variables with validation.
-
-        Args:
-            dry_run: If True, only Spotify credentials are required
-
-        Returns:
-            Validated DownloadConfig instance
-
-        Raises:
-            ValueError: If required variables are missing or invalid
-        """
-        load_dotenv()
-
-        # Validate and get Spotify credentials (always required)
-        spotify_client_id = os.getenv(EnvVars.SPOTIFY_CLIENT_ID, '').strip()
-        spotify_client_secret = os.getenv(EnvVars.SPOTIFY_CLIENT_SECRET, '').strip()
-
-        if not spotify_client_id:
-            raise ValueError(f"Missing required variable: {EnvVars.SPOTIFY_CLIENT_ID}")
-        if not spotify_client_secret:
-            raise ValueError(f"Missing required variable: {EnvVars.SPOTIFY_CLIENT_SECRET}")
-
-        # Validate Spotify credentials format
-        cls._validate_env_var(EnvVars.SPOTIFY_CLIENT_ID, spotify_client_id, min_length=10)
-        cls._validate_env_var(EnvVars.SPOTIFY_CLIENT_SECRET, spotify_client_secret, min_length=10)
-
-        # Validate optional numeric settings
-        delay = cls._validate_numeric(
-            EnvVars.DELAY_BETWEEN_REQUESTS,
-            os.getenv(EnvVars.DELAY_BETWEEN_REQUESTS, str(Defaults.DELAY_BETWEEN_REQUESTS)),
-            min_val=0, max_val=3600
-        )
-        max_retries = int(cls._validate_numeric(
-            EnvVars.MAX_RETRIES,
-            os.getenv(EnvVars.MAX_RETRIES, str(Defaults.MAX_RETRIES)),
-            min_val=1, max_val=10, is_int=True
-        ))
-        response_timeout = int(cls._validate_numeric(
-            EnvVars.RESPONSE_TIMEOUT,
-            os.getenv(EnvVars.RESPONSE_TIMEOUT, str(Defaults.RESPONSE_TIMEOUT)),
-            min_val=30, max_val=3600, is_int=True
-        ))
-
-        # For dry run, use dummy Telegram values
-        if dry_run:
-            return cls(
-                spotify_client_id=spotify_client_id,
-                spotify_client_secret=spotify_client_secret,
-                telegram_api_id=12345,  # Dummy value
-                telegram_api_hash="dummy_hash",  # Dummy value
-                telegram_phone_number="+1234567890",  # Dummy value
-                external_bot_username="@dummy_bot",  # Dummy value
-                download_folder=os.getenv(EnvVars.DOWNLOAD_FOLDER, Defaults.DOWNLOAD_FOLDER),
-                music_library_path=os.getenv(EnvVars.MUSIC_LIBRARY_PATH, Defaults.MUSIC_LIBRARY_PATH),
-                delay_between_requests=delay,
-                max_retries=max_retries,
-                response_timeout=response_timeout,
-            )
-
-        # For actual download, validate Telegram credentials
-        telegram_api_id_str = os.getenv(EnvVars.TELEGRAM_API_ID, '').strip()
-        telegram_api_hash = os.getenv(EnvVars.TELEGRAM_API_HASH, '').strip()
-        telegram_phone = os.getenv(EnvVars.TELEGRAM_PHONE_NUMBER, '').strip()
-        bot_username = os.getenv(EnvVars.EXTERNAL_BOT_USERNAME, '').strip()
-
-        if not telegram_api_id_str:
-            raise ValueError(f"Missing required variable: {EnvVars.TELEGRAM_API_ID}")
-        if not telegram_api_hash:
-            raise ValueError(f"Missing required variable: {EnvVars.TELEGRAM_API_HASH}")
-        if not telegram_phone:
-            raise ValueError(f"Missing required variable: {EnvVars.TELEGRAM_PHONE_NUMBER}")
-        if not bot_username:
-            raise ValueError(f"Missing required variable: {EnvVars.EXTERNAL_BOT_USERNAME}")
-
-        # Validate Telegram API ID is a valid integer
-        try:
-            telegram_api_id = int(telegram_api_id_str)
-        except ValueError:
-            raise ValueError(f"{EnvVars.TELEGRAM_API_ID} must be a valid integer")
-
-        # Validate Telegram API hash format
-        cls._validate_env_var(EnvVars.TELEGRAM_API_HASH, telegram_api_hash, min_length=20)
-
-        # Validate phone number format (basic check)
-        if not telegram_phone.startswith('+'):
-            raise ValueError(f"{EnvVars.TELEGRAM_PHONE_NUMBER} must start with '+' and include country code")
-
-        return cls(
-            spotify_client_id=spotify_client_id,
-            spotify_client_secret=spotify_client_secret,
-            telegram_api_id=telegram_api_id,
-            telegram_api_hash=telegram_api_hash,
-            telegram_phone_number=telegram_phone,
-            external_bot_username=bot_username,
-            download_folder=os.getenv(EnvVars.DOWNLOAD_FOLDER, Defaults.DOWNLOAD_FOLDER),
-            music_library_path=os.getenv(EnvVars.MUSIC_LIBRARY_PATH, Defaults.MUSIC_LIBRARY_PATH),
-            delay_between_requests=delay,
-            max_retries=max_retries,
-            response_timeout=response_timeout,
-        )
-
 
 class SpotifyDownloader:
     """Main orchestrator class that coordinates all components"""
@@ -236,10 +75,42 @@ class SpotifyDownloader:
         # Debug mode
         self.debug_mode = False
         
-        # Progress tracking to avoid duplicates
-        self.last_batch_progress_message = ""
+        # IDs of tracks completed in the current session, kept in step with
+        # the progress tracker so the hot loops avoid per-track status lookups
+        self._completed_ids: Set[str] = set()
+
+        # Futures resolved when a track reaches completed or failed, so the
+        # final drain wakes as soon as a file lands instead of on a timer
+        self._settled: Dict[str, asyncio.Future] = {}
+
+        # Tracks sent or received this run that have not settled yet, and a
+        # flag raised whenever that set or a download's state changes
+        self._in_flight: Set[str] = set()
+        self._progress_changed = asyncio.Event()
+
+        # The in-flight tracks whose file is being downloaded, kept in step
+        # with their status so the final wait can count them without lookups
+        self._downloading: Set[str] = set()
+
+        # Caps sends in flight at once; pacing itself is the Telegram client's job.
+        # Halved on every flood wait, then widened back one step per run of
+        # SEND_RECOVERY_SUCCESSES successful sends
+        self._send_semaphore = AdjustableSemaphore(BatchConstants.MAX_CONCURRENT_SENDS)
+        self._sends_since_flood_wait = 0
+
+        # Dedicated threads for moving and cataloging downloaded files, so file
+        # I/O never queues behind prompts or flushes in the default executor
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=FileConstants.IO_WORKERS, thread_name_prefix='file-io'
+        )
+
+        # Files received from the bot wait here for a download worker
+        self._download_queue: asyncio.Queue = asyncio.Queue()
+        self._download_workers: List[asyncio.Task] = []
         
-        # Callbacks for progress reporting
+        # Callbacks for progress reporting. The send path schedules them as
+        # tasks (kept here until done) rather than waiting on them
+        self._callback_tasks: Set[asyncio.Task] = set()
         self.on_track_sent: Optional[Callable] = None
         self.on_track_downloaded: Optional[Callable] = None
         self.on_track_failed: Optional[Callable] = None
@@ -268,6 +139,15 @@ class SpotifyDownloader:
                 on_download_failed=self._handle_download_failed,
                 on_bot_response=self._handle_bot_response
             )
+            self.telegram.on_flood_wait = self._handle_flood_wait
+
+            # Creates the temp dir before the first file can arrive
+            await asyncio.to_thread(self.file_manager.prepare_directories, ())
+
+            self._download_workers = [
+                asyncio.create_task(self._download_worker())
+                for _ in range(BatchConstants.MAX_CONCURRENT_DOWNLOADS)
+            ]
             
             print(f"{Fore.GREEN}✓ All components initialized successfully{Style.RESET_ALL}")
             return True
@@ -282,8 +162,13 @@ class SpotifyDownloader:
                               resume: bool = True,
                               limit: Optional[int] = None,
                               sequential: bool = False,
-                              start_from: int = 1) -> Dict:
-        """Download all tracks from a Spotify playlist"""
+                              start_from: int = 1,
+                              assume_yes: bool = False) -> Dict:
+        """Download all tracks from a Spotify playlist
+
+        With assume_yes, the resume and confirmation prompts are answered
+        "yes" automatically so the command can run unattended.
+        """
         
         # Check for resumable session
         if resume:
@@ -295,47 +180,84 @@ class SpotifyDownloader:
                 remaining = resume_info['pending_count'] + resume_info['failed_count']
                 print(f"  Remaining: {remaining} tracks ({resume_info['pending_count']} pending, {resume_info['failed_count']} failed)")
                 
-                if input(f"{Fore.CYAN}Resume previous session? (y/n): {Style.RESET_ALL}").lower() == 'y':
+                if assume_yes or (await ainput(f"{Fore.CYAN}Resume previous session? (y/n): {Style.RESET_ALL}")).lower() == 'y':
                     return await self._resume_session(dry_run, batch_size, limit, sequential, start_from)
         
         # Start new session
-        return await self._start_new_session(playlist_url, dry_run, batch_size, limit, sequential, start_from)
+        return await self._start_new_session(playlist_url, dry_run, batch_size, limit, sequential, start_from,
+                                             assume_yes=assume_yes)
     
-    async def _start_new_session(self, playlist_url: str, dry_run: bool, batch_size: Optional[int], limit: Optional[int], sequential: bool, start_from: int) -> Dict:
+    async def _start_new_session(self, playlist_url: str, dry_run: bool, batch_size: Optional[int], limit: Optional[int], sequential: bool, start_from: int,
+                                 assume_yes: bool = False) -> Dict:
         """Start a new download session"""
         try:
             # Get playlist info and tracks
             print(f"{Fore.CYAN}Fetching playlist information...{Style.RESET_ALL}")
             
-            playlist_info = self.spotify.get_playlist_info(playlist_url)
+            # Apply start_from offset (convert from 1-based to 0-based index)
+            start_index = max(0, start_from - 1)
+
+            # With a limit only a window of the playlist is needed: page through
+            # it lazily and stop requesting pages once the window is filled
+            windowed = bool(limit and limit > 0) and self.spotify.detect_content_type(playlist_url) == 'playlist'
+            if windowed:
+                fetch_tracks = partial(self._fetch_playlist_window, playlist_url, start_index, limit)
+            else:
+                fetch_tracks = partial(self.spotify.extract_tracks, playlist_url)
+
+            # Both are blocking HTTP calls: run them concurrently, off the event loop
+            playlist_info, fetched = await asyncio.gather(
+                asyncio.to_thread(self.spotify.get_playlist_info, playlist_url),
+                asyncio.to_thread(fetch_tracks),
+            )
             if not playlist_info:
                 return {"success": False, "error": "Could not fetch playlist information"}
             
-            tracks = self.spotify.extract_tracks(playlist_url)
+            if windowed:
+                # Playable tracks, the same count the full fetch uses; None when
+                # the window filled before the end of the playlist was reached
+                tracks, original_track_count = fetched
+                if not tracks and start_index:
+                    return {"success": False, "error": f"Start position {start_from} is beyond playlist length ({original_track_count} tracks)"}
+            else:
+                tracks = fetched
+            
             if not tracks:
                 return {"success": False, "error": "No tracks found in playlist"}
             
-            # Apply start_from offset (convert from 1-based to 0-based index)
-            start_index = max(0, start_from - 1)
-            if start_index >= len(tracks):
-                return {"success": False, "error": f"Start position {start_from} is beyond playlist length ({len(tracks)} tracks)"}
-            
-            original_track_count = len(tracks)
-            tracks = tracks[start_index:]
+            if not windowed:
+                if start_index >= len(tracks):
+                    return {"success": False, "error": f"Start position {start_from} is beyond playlist length ({len(tracks)} tracks)"}
+                
+                original_track_count = len(tracks)
+                tracks = tracks[start_index:]
             
             if start_from > 1:
-                print(f"\n{Fore.YELLOW}Starting from track #{start_from} ({original_track_count - len(tracks)} tracks skipped){Style.RESET_ALL}")
+                print(f"\n{Fore.YELLOW}Starting from track #{start_from} ({start_index} tracks skipped){Style.RESET_ALL}")
             
             # Apply limit if specified
             if limit and limit > 0:
                 tracks = tracks[:limit]
                 print(f"{Fore.YELLOW}Limiting to {limit} tracks{Style.RESET_ALL}")
+
+            # Drop repeated tracks (keeping the first occurrence); the session is keyed by track ID
+            unique_by_id = {}
+            for track in tracks:
+                unique_by_id.setdefault(track.id, track)
+            unique_tracks = list(unique_by_id.values())
+            if len(unique_tracks) < len(tracks):
+                print(f"{Fore.YELLOW}Skipping {len(tracks) - len(unique_tracks)} duplicate track(s){Style.RESET_ALL}")
+                tracks = unique_tracks
             
             # Display playlist info
             print(f"\n{Fore.CYAN}Playlist: {playlist_info['name']}{Style.RESET_ALL}")
             print(f"{Fore.CYAN}Owner: {playlist_info['owner']}{Style.RESET_ALL}")
             if start_from > 1 or (limit and limit > 0):
-                print(f"{Fore.CYAN}Processing tracks {start_from}-{start_from + len(tracks) - 1} of {original_track_count} total{Style.RESET_ALL}")
+                if original_track_count is None:
+                    of_total = f"({playlist_info['total_tracks']} listed in playlist)"
+                else:
+                    of_total = f"of {original_track_count} total"
+                print(f"{Fore.CYAN}Processing tracks {start_from}-{start_from + len(tracks) - 1} {of_total}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.CYAN}Tracks: {len(tracks)}{Style.RESET_ALL}")
             
@@ -345,30 +267,16 @@ class SpotifyDownloader:
             if dry_run:
                 return self._dry_run_report(tracks)
 
-            # Check catalog — skip tracks we already have
-            missing_tracks = []
-            skipped = 0
-            for track in tracks:
-                # Check by spotify_id first
-                found = self.catalog.find_track_by_spotify_id(track.id)
-                if found:
-                    skipped += 1
-                    continue
-
-                # Fallback: check by artist:title hash
-                hash_id = LibraryCatalog.generate_track_id(track.artist_string, track.name)
-                found = self.catalog.find_track(track.name, track.artist_string)
-                if found:
-                    # Backfill spotify_id for future fast lookups
-                    self.catalog.backfill_spotify_id(hash_id, track.id)
-                    skipped += 1
-                    continue
-
-                missing_tracks.append(track)
-
-            print(f"\n  Total: {len(tracks)} tracks in playlist")
-            print(f"  Already in library: {skipped}")
-            print(f"  To download: {len(missing_tracks)}")
+            # Check catalog — skip tracks we already have. One SQLite query
+            # per track, so keep it off the event loop
+            missing_tracks = await asyncio.to_thread(self._find_missing_tracks, tracks)
+            skipped = len(tracks) - len(missing_tracks)
+
+            total = len(tracks)
+            scale = 100.0 / (total or 1)
+            print(f"\n  Total: {total} tracks in playlist")
+            print(f"  Already in library: {skipped} ({skipped * scale:.1f}%)")
+            print(f"  To download: {len(missing_tracks)} ({len(missing_tracks) * scale:.1f}%)")
 
             if not missing_tracks:
                 print(f"\n{Fore.GREEN}  All tracks already in library!{Style.RESET_ALL}")
@@ -378,7 +286,11 @@ class SpotifyDownloader:
 
             # Convert Spotify URLs to Tidal URLs (required by bot)
             print(f"\n{Fore.CYAN}Converting links to Tidal...{Style.RESET_ALL}")
-            tidal_urls = self.link_converter.convert_tracks(tracks, debug=self.debug_mode)
+            # Rate-limited HTTP lookups; run them off the event loop so the
+            # already-connected Telegram client keeps servicing its connection
+            tidal_urls = await asyncio.to_thread(
+                self.link_converter.convert_tracks, tracks, debug=self.debug_mode
+            )
 
             # Only keep tracks with Tidal URLs
             ready_tracks = []
@@ -401,7 +313,7 @@ class SpotifyDownloader:
             tracks = ready_tracks
 
             # Security confirmation
-            if not self._confirm_download(len(tracks), batch_size):
+            if not await self._confirm_download(len(tracks), batch_size, assume_yes):
                 return {"success": False, "error": "Download cancelled by user"}
             
             # Start progress tracking
@@ -415,6 +327,24 @@ class SpotifyDownloader:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _fetch_playlist_window(self, playlist_url: str, start_index: int,
+                               limit: int) -> Tuple[List[Track], Optional[int]]:
+        """
+        Fetch up to limit playable tracks starting at start_index, paging lazily.
+
+        Returns:
+            (tracks, total) where total is the playlist's playable track count
+            if the listing was read to the end, else None
+        """
+        window: List[Track] = []
+        seen = 0
+        for seen, track in enumerate(self.spotify.iter_playlist_tracks(playlist_url), 1):
+            if seen > start_index:
+                window.append(track)
+                if len(window) == limit:
+                    return window, None
+        return window, seen
+
     async def _resume_session(self, dry_run: bool, batch_size: Optional[int], limit: Optional[int], sequential: bool, start_from: int) -> Dict:
         """Resume an existing session"""
         session = self.progress_tracker.load_session()
@@ -427,14 +357,18 @@ class SpotifyDownloader:
         if session.playlist_name:
             self.file_manager.set_playlist_name(session.playlist_name)
 
-        # Reset stuck tracks (sent_to_bot/downloading from crashed session)
-        stuck_statuses = [TrackStatus.SENT_TO_BOT, TrackStatus.DOWNLOADING]
-        for status in stuck_statuses:
-            stuck = self.progress_tracker.get_tracks_by_status(status)
-            for track in stuck:
-                self.progress_tracker.update_track_status(track.track_id, TrackStatus.PENDING)
-            if stuck:
-                print(f"  Reset {len(stuck)} stuck tracks ({status.value} → pending)")
+        # Reset stuck tracks (sent_to_bot/downloading from crashed session),
+        # collected in a single pass over the session
+        stuck: Dict[TrackStatus, List[str]] = {TrackStatus.SENT_TO_BOT: [], TrackStatus.DOWNLOADING: []}
+        for track_progress in session.tracks.values():
+            ids = stuck.get(track_progress.status)
+            if ids is not None:
+                ids.append(track_progress.track_id)
+        for status, track_ids in stuck.items():
+            for track_id in track_ids:
+                self.progress_tracker.update_track_status(track_id, TrackStatus.PENDING)
+            if track_ids:
+                print(f"  Reset {len(track_ids)} stuck tracks ({status.value} → pending)")
 
         # Get all processable tracks
         pending_tracks = self.progress_tracker.get_pending_tracks()
@@ -454,18 +388,7 @@ class SpotifyDownloader:
         print(f"{Fore.CYAN}Resuming session with {len(all_processable)} tracks{Style.RESET_ALL}")
         
         if dry_run:
-            track_objects = []
-            for track_progress in all_processable:
-                track = Track(
-                    id=track_progress.track_id,
-                    name=track_progress.track_name.split(' - ', 1)[-1],
-                    artists=[track_progress.track_name.split(' - ', 1)[0]],
-                    album="",
-                    url=track_progress.track_url,
-                    duration_ms=0
-                )
-                track_objects.append(track)
-            return self._dry_run_report(track_objects)
+            return self._dry_run_report([self._track_from_progress(tp) for tp in all_processable])
         
         # Convert track progress back to Track objects for processing
         tracks_to_process = []
@@ -477,30 +400,65 @@ class SpotifyDownloader:
                     TrackStatus.PENDING
                 )
             
-            # Create minimal Track object for processing
-            track = Track(
-                id=track_progress.track_id,
-                name=track_progress.track_name.split(' - ', 1)[-1],
-                artists=[track_progress.track_name.split(' - ', 1)[0]],
-                album="",
-                url=track_progress.track_url,
-                duration_ms=0
-            )
-            tracks_to_process.append(track)
+            tracks_to_process.append(self._track_from_progress(track_progress))
         
         return await self._process_tracks(tracks_to_process, batch_size or self.config.batch_size, sequential)
+
+    @staticmethod
+    def _track_from_progress(track_progress: TrackProgress) -> Track:
+        """Create the minimal Track object needed to reprocess a saved track"""
+        if track_progress.title:
+            artist, title = track_progress.artist, track_progress.title
+        else:
+            # Older progress files only have the combined "Artists - Title"
+            artist, sep, title = track_progress.track_name.partition(' - ')
+            if not sep:
+                title = artist
+        return Track(
+            id=track_progress.track_id,
+            name=title,
+            artists=[artist],
+            album="",
+            url=track_progress.track_url,
+            duration_ms=0
+        )
     
+    def _find_missing_tracks(self, tracks: List[Track]) -> List[Track]:
+        """Return the tracks that are not in the library catalog yet"""
+        missing_tracks = []
+        for track in tracks:
+            # Check by spotify_id first
+            found = self.catalog.find_track_by_spotify_id(track.id)
+            if found:
+                continue
+
+            # Fallback: check by artist:title hash
+            hash_id = LibraryCatalog.generate_track_id(track.artist_string, track.name)
+            found = self.catalog.find_track(track.name, track.artist_string)
+            if found:
+                # Backfill spotify_id for future fast lookups
+                self.catalog.backfill_spotify_id(hash_id, track.id)
+                continue
+
+            missing_tracks.append(track)
+        return missing_tracks
+
     def _dry_run_report(self, tracks: List[Track]) -> Dict:
         """Generate dry run report"""
-        print(f"\n{Fore.YELLOW}DRY RUN MODE - No messages will be sent{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}Would process {len(tracks)} tracks:{Style.RESET_ALL}\n")
-        
-        for i, track in enumerate(tracks[:20], 1):  # Show first 20
-            print(f"{i:3d}. {track.artist_string} - {track.name}")
-        
+        lines = [
+            f"\n{Fore.YELLOW}DRY RUN MODE - No messages will be sent{Style.RESET_ALL}\n",
+            f"{Fore.YELLOW}Would process {len(tracks)} tracks:{Style.RESET_ALL}\n\n",
+        ]
+        lines.extend(
+            f"{i:3d}. {track.display_name}\n"
+            for i, track in enumerate(tracks[:20], 1)  # Show first 20
+        )
         if len(tracks) > 20:
-            print(f"     ... and {len(tracks) - 20} more tracks")
-        
+            lines.append(f"     ... and {len(tracks) - 20} more tracks\n")
+
+        # Emit the whole report in one write
+        sys.stdout.write(''.join(lines))
+
         return {
             "success": True,
             "dry_run": True,
@@ -508,7 +466,7 @@ class SpotifyDownloader:
             "tracks_shown": min(20, len(tracks))
         }
     
-    def _confirm_download(self, track_count: int, batch_size: Optional[int]) -> bool:
+    async def _confirm_download(self, track_count: int, batch_size: Optional[int], assume_yes: bool = False) -> bool:
         """Get user confirmation for download"""
         effective_batch_size = batch_size or self.config.batch_size
         
@@ -519,301 +477,270 @@ class SpotifyDownloader:
         print(f"- Session stored securely in: {self.config.session_dir}")
         print(f"- Total tracks to process: {track_count}")
         
-        response = input(f"\n{Fore.CYAN}Continue? (yes/no): {Style.RESET_ALL}")
+        if assume_yes:
+            return True
+
+        # Read in a thread so Telegram updates keep flowing while the prompt is open
+        response = await ainput(f"\n{Fore.CYAN}Continue? (yes/no): {Style.RESET_ALL}")
         return response.lower() in ['yes', 'y']
     
     async def _process_tracks(self, tracks: List[Track], batch_size: int, sequential: bool = False) -> Dict:
+        """
+        Process tracks, writing progress on a timer instead of per status change.
+
+        Console output is written by a background thread meanwhile, so the
+        many per-track prints never block the event loop on the terminal.
+        """
+        self.progress_tracker.defer_saves = True
+        flush_task = asyncio.create_task(self._periodic_flush())
+        try:
+            with queued_stdout():
+                return await self._process_batches(tracks, batch_size, sequential)
+        finally:
+            flush_task.cancel()
+            try:
+                await self._drain_callbacks()
+            finally:
+                self.progress_tracker.defer_saves = False
+                await asyncio.to_thread(self.progress_tracker.flush)
+
+    async def _periodic_flush(self) -> None:
+        """Write unsaved progress every few seconds, off the event loop"""
+        while True:
+            await asyncio.sleep(BatchConstants.PROGRESS_FLUSH_INTERVAL)
+            await asyncio.to_thread(self.progress_tracker.flush)
+
+    async def _process_batches(self, tracks: List[Track], batch_size: int, sequential: bool = False) -> Dict:
         """Process tracks in batches"""
-        total_tracks = len(tracks)
-        successful = 0
-        failed = 0
-        
         print(f"\n{Fore.CYAN}Starting download process...{Style.RESET_ALL}")
-        
-        # Process in batches
-        for batch_start in range(0, total_tracks, batch_size):
-            batch_end = min(batch_start + batch_size, total_tracks)
-            batch = tracks[batch_start:batch_end]
-            batch_num = (batch_start // batch_size) + 1
-            total_batches = (total_tracks + batch_size - 1) // batch_size
-            
-            print(f"\n{Fore.CYAN}Processing batch {batch_num}/{total_batches} ({batch_start + 1}-{batch_end} of {total_tracks}){Style.RESET_ALL}")
-            
-            if sequential:
-                # Process tracks one by one for cleaner progress display
-                for i, track in enumerate(batch):
-                    global_index = batch_start + i + 1
-                    
-                    # Skip if already completed
-                    if self._is_track_completed(track.id):
-                        print(f"{Fore.YELLOW}[{global_index}/{total_tracks}] Already completed, skipping{Style.RESET_ALL}")
-                        successful += 1
-                        continue
-                    
-                    print(f"\n{Fore.CYAN}[{global_index}/{total_tracks}] Processing: {track.artist_string} - {track.name}{Style.RESET_ALL}")
-                    
-                    # Mark as sent immediately (before potential failure)
-                    self.progress_tracker.mark_track_sent(track.id)
-                    
-                    # Send to bot
-                    if await self.telegram.send_track_to_bot(track):
-                        if self.on_track_sent:
-                            await self.on_track_sent(track, global_index, total_tracks)
-                        
-                        # Wait for this specific track to complete before moving to next
-                        print(f"{Fore.YELLOW}Waiting for track to complete...{Style.RESET_ALL}")
-                        await self._wait_for_track_completion(track.id, timeout=self.config.response_timeout)
-                        
-                        # Check if it completed successfully
-                        if self._is_track_completed(track.id):
-                            successful += 1
-                            print(f"{Fore.GREEN}✓ Track completed successfully{Style.RESET_ALL}")
-                        else:
-                            failed += 1
-                            print(f"{Fore.RED}✗ Track failed or timed out{Style.RESET_ALL}")
-                    else:
-                        failed += 1
-                        self.progress_tracker.mark_track_failed(track.id, "Failed to send to bot")
-                        if self.on_track_failed:
-                            await self.on_track_failed(track, "Failed to send to bot")
-            else:
-                # Process tracks in parallel (original behavior)
-                for i, track in enumerate(batch):
-                    global_index = batch_start + i + 1
-                    
-                    # Skip if already completed
-                    if self._is_track_completed(track.id):
-                        print(f"{Fore.YELLOW}[{global_index}/{total_tracks}] Already completed, skipping{Style.RESET_ALL}")
-                        successful += 1
-                        continue
-                    
-                    print(f"\n{Fore.CYAN}[{global_index}/{total_tracks}] Sending: {track.artist_string} - {track.name}{Style.RESET_ALL}")
-                    
-                    # Mark as sent immediately (before potential failure)
-                    self.progress_tracker.mark_track_sent(track.id)
-                    
-                    # Send to bot
-                    if await self.telegram.send_track_to_bot(track):
-                        if self.on_track_sent:
-                            await self.on_track_sent(track, global_index, total_tracks)
-                    else:
-                        failed += 1
-                        self.progress_tracker.mark_track_failed(track.id, "Failed to send to bot")
-                        if self.on_track_failed:
-                            await self.on_track_failed(track, "Failed to send to bot")
-                
-                # Wait for ALL tracks in this batch to complete before next batch
-                if batch_end < total_tracks:
-                    self._clear_print(f"{Fore.YELLOW}Waiting for batch to complete before processing next batch...{Style.RESET_ALL}")
-                    await self._wait_for_batch_completion(batch)
-        
+        await asyncio.to_thread(self.file_manager.prepare_directories, tracks)
+
+        session = self.progress_tracker.current_session
+        self._completed_ids = {
+            track_id for track_id, track_progress in session.tracks.items()
+            if track_progress.status == TrackStatus.COMPLETED
+        } if session else set()
+        self._in_flight = set()
+        self._downloading = set()
+        
+        if sequential:
+            # One track outstanding at a time, each given the full response timeout
+            await self._process_window(tracks, 1, stale_timeout=self.config.response_timeout)
+        else:
+            await self._process_window(tracks, batch_size)
+
         # Wait for active downloads to finish; skip tracks the bot never responded to
         self._clear_print(f"{Fore.YELLOW}Waiting for remaining downloads...{Style.RESET_ALL}")
 
-        last_activity_time = time.time()
+        last_activity_time = time.monotonic()
         prev_downloading = 0
-        prev_completed = 0
+        prev_in_flight = 0
 
         while True:
             session = self.progress_tracker.current_session
             if not session:
                 break
 
-            incomplete_tracks = [
-                t for t in session.tracks.values()
-                if t.status not in [TrackStatus.COMPLETED, TrackStatus.FAILED]
-            ]
-            downloading = [t for t in incomplete_tracks if t.status == TrackStatus.DOWNLOADING]
-            waiting_for_bot = [t for t in incomplete_tracks if t.status == TrackStatus.SENT_TO_BOT]
-            completed = len(session.tracks) - len(incomplete_tracks)
+            # Cleared before looking, so a change from here on wakes the wait below
+            self._progress_changed.clear()
+
+            # Only tracks this run sent (or is receiving) and that have not settled
+            in_flight = self._in_flight
 
-            # All done
-            if not incomplete_tracks:
+            # All done; drop requests the bot will never answer
+            if not in_flight:
                 print(f"{Fore.GREEN}All downloads completed{Style.RESET_ALL}")
+                await self.telegram.clear_pending()
                 break
 
+            downloading = len(self._downloading)
+            waiting_for_bot = len(in_flight) - downloading
+
             # Track activity — reset timer when something changes
-            if len(downloading) != prev_downloading or completed != prev_completed:
-                last_activity_time = time.time()
-                prev_downloading = len(downloading)
-                prev_completed = completed
+            if downloading != prev_downloading or len(in_flight) != prev_in_flight:
+                last_activity_time = time.monotonic()
+                prev_downloading = downloading
+                prev_in_flight = len(in_flight)
 
-            # Active downloads — keep waiting
+            # Active downloads — keep waiting; each one ends by itself (done or timed out)
             if downloading:
-                self._clear_print(f"{Fore.YELLOW}Waiting for {len(downloading)} download(s) to complete...{Style.RESET_ALL}")
-            # Only stuck tracks remaining — give 60s then move on
-            elif waiting_for_bot and (time.time() - last_activity_time) >= 60:
-                print(f"{Fore.YELLOW}{len(waiting_for_bot)} track(s) never received from bot — finishing session{Style.RESET_ALL}")
-                break
-            elif waiting_for_bot:
-                self._clear_print(f"{Fore.YELLOW}Waiting for {len(waiting_for_bot)} bot response(s)...{Style.RESET_ALL}")
-
-            # Clean up orphaned pending requests
-            pending = await self.telegram.get_pending_count()
-            if not incomplete_tracks and pending > 0:
-                async with self.telegram._pending_lock:
-                    self.telegram.pending_responses.clear()
-                break
-
-            await asyncio.sleep(5)
-        
-        # Complete session
-        self.progress_tracker.complete_session()
+                self._clear_print(f"{Fore.YELLOW}Waiting for {downloading} download(s) to complete...{Style.RESET_ALL}")
+                timeout = None
+            else:
+                # Only stuck tracks remaining — give 60s then move on
+                timeout = 60 - (time.monotonic() - last_activity_time)
+                if timeout <= 0:
+                    print(f"{Fore.YELLOW}{waiting_for_bot} track(s) never received from bot — finishing session{Style.RESET_ALL}")
+                    break
+                self._clear_print(f"{Fore.YELLOW}Waiting for {waiting_for_bot} bot response(s)...{Style.RESET_ALL}")
+
+            # Sleep until the next settle or download start, or until the 60s rule is due
+            try:
+                await asyncio.wait_for(self._progress_changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        # Complete session; it waits for the final write, so run it off the loop
+        await asyncio.to_thread(self.progress_tracker.complete_session)
         
         # Generate final report
         return self._generate_final_report()
     
-    def _is_track_completed(self, track_id: str) -> bool:
-        """Check if track is already completed"""
-        if not self.current_session_id:
-            return False
-        
-        session = self.progress_tracker.current_session
-        if not session or track_id not in session.tracks:
-            return False
-        
-        return session.tracks[track_id].status == TrackStatus.COMPLETED
-    
-    async def _wait_for_track_completion(self, track_id: str, timeout: int = 600):
-        """Wait for a specific track to complete"""
-        start_time = time.time()
-        
-        while (time.time() - start_time) < timeout:
-            session = self.progress_tracker.current_session
-            if not session or track_id not in session.tracks:
-                break
-            
-            track_status = session.tracks[track_id].status
-            
-            # Check if track is completed or failed
-            if track_status in [TrackStatus.COMPLETED, TrackStatus.FAILED]:
-                break
-            
-            await asyncio.sleep(2)  # Check every 2 seconds
-        
-        return self._is_track_completed(track_id)
-    
-    async def _wait_for_batch_completion(self, batch_tracks: List[Track], timeout: int = 600):
+    async def _process_window(self, tracks: List[Track], window_size: int,
+                              stale_timeout: float = BatchConstants.WINDOW_STALE_TIMEOUT) -> None:
         """
-        Wait for all tracks in a batch to complete (success, fail, or not found).
-
-        Exit conditions (checked every 5s):
-        - All tracks completed or failed
-        - 60s with no response at all from bot (all stuck at SENT_TO_BOT)
-        - 30s after last completion, remaining tracks still at SENT_TO_BOT
-        - Active downloads keep the batch alive indefinitely (no hard timeout)
+        Keep up to window_size tracks outstanding with the bot at once.
 
-        Note: On exit, incomplete tracks are NOT marked as failed - they continue
-        processing in the background and can still complete in subsequent batches.
+        A track's slot is handed to the next track as soon as it settles, so
+        one slow download no longer holds back a whole batch. Messages are
+        still spaced by the Telegram client's send bucket. Sequential mode
+        is a window of one.
         """
-        start_time = time.time()
-        batch_track_ids = [track.id for track in batch_tracks]
-        last_completion_time = None  # When the most recent track finished
-        prev_completed_count = 0
-        stale_timeout = 30  # Seconds to wait for stuck tracks after others finish
-
-        if self.debug_mode:
-            print(f"{Fore.MAGENTA}DEBUG: Waiting for batch with track IDs: {batch_track_ids}{Style.RESET_ALL}")
-
-        while True:
-            session = self.progress_tracker.current_session
-            if not session:
-                break
+        total_tracks = len(tracks)
+        window = asyncio.Semaphore(window_size)
+        print(f"\n{Fore.CYAN}Processing {total_tracks} tracks, up to {window_size} at a time{Style.RESET_ALL}")
 
-            # Check status of all tracks in this batch
-            incomplete_tracks = []
-            completed_statuses = []
-            completed_count = 0
-            all_incomplete_stuck = True  # True if all incomplete tracks are just SENT_TO_BOT
-
-            for track_id in batch_track_ids:
-                if track_id in session.tracks:
-                    track_status = session.tracks[track_id].status
-                    completed_statuses.append(track_status.value)
-                    if track_status in [TrackStatus.COMPLETED, TrackStatus.FAILED]:
-                        completed_count += 1
-                    else:
-                        incomplete_tracks.append(track_id)
-                        # If any incomplete track is actively downloading, don't skip
-                        if track_status != TrackStatus.SENT_TO_BOT:
-                            all_incomplete_stuck = False
-                else:
-                    incomplete_tracks.append(track_id)
-                    completed_statuses.append("not_in_session")
+        async def run(track: Track, global_index: int) -> None:
+            async with window:
+                if await self._send_one(track, global_index, total_tracks):
+                    await self._hold_window_slot(track, global_index, total_tracks, stale_timeout)
 
-            if self.debug_mode and len(incomplete_tracks) > 0:
-                print(f"{Fore.MAGENTA}DEBUG: Incomplete tracks: {incomplete_tracks}, Statuses: {completed_statuses}{Style.RESET_ALL}")
+        # The TaskGroup cancels the remaining tracks if one of them raises
+        async with asyncio.TaskGroup() as group:
+            for i, track in enumerate(tracks):
+                group.create_task(run(track, i + 1))
 
-            if not incomplete_tracks:
-                print(f"{Fore.GREEN}✓ Batch completed - all tracks processed{Style.RESET_ALL}")
-                break
+    async def _hold_window_slot(self, track: Track, global_index: int, total_tracks: int,
+                                stale_timeout: float) -> None:
+        """
+        Wait until a sent track settles before freeing its window slot.
 
-            # Update last_completion_time when a new track finishes
-            if completed_count > prev_completed_count:
-                last_completion_time = time.time()
-                prev_completed_count = completed_count
-
-            # Early exit: some tracks done, remaining are stuck at SENT_TO_BOT
-            if (completed_count > 0 and all_incomplete_stuck and
-                    last_completion_time is not None and
-                    (time.time() - last_completion_time) >= stale_timeout):
-                stuck_count = len(incomplete_tracks)
-                self._clear_print(
-                    f"{Fore.YELLOW}Skipping {stuck_count} track(s) that never started downloading "
-                    f"({stale_timeout}s after last completion){Style.RESET_ALL}")
-                break
+        A download in progress keeps the slot indefinitely; a track the bot
+        has not started sending after stale_timeout gives it up and is left
+        to finish in the background, as the final wait allows.
+        """
+        # The bot may have answered while the send was still retrying; a track
+        # that already settled has no future left for _settle to resolve
+        if track.id not in self._in_flight:
+            return
+
+        await self._wait_for_any_settled([track.id], timeout=stale_timeout)
+        if track.id not in self._in_flight:
+            return
+
+        if self._track_status(track.id) == TrackStatus.SENT_TO_BOT:
+            self._clear_print(
+                f"{Fore.YELLOW}[{global_index}/{total_tracks}] No file after "
+                f"{stale_timeout:g}s, continuing in background{Style.RESET_ALL}")
+            return
+
+        # Download in progress; it settles on its own, either way
+        while track.id in self._in_flight:
+            await self._wait_for_any_settled([track.id], timeout=None)
+
+    async def _send_one(self, track: Track, global_index: int, total_tracks: int) -> Optional[bool]:
+        """
+        Send one track to the bot and record the outcome.
 
-            # Early exit: NO tracks have started downloading at all after 60s
-            if (completed_count == 0 and all_incomplete_stuck and
-                    (time.time() - start_time) >= 60):
-                self._clear_print(
-                    f"{Fore.YELLOW}No tracks received after 60s — skipping batch{Style.RESET_ALL}")
-                break
+        Returns:
+            None if the track was already completed, otherwise whether the send succeeded
+        """
+        # Skip if already completed
+        if self._is_track_completed(track.id):
+            print(f"{Fore.YELLOW}[{global_index}/{total_tracks}] Already completed, skipping{Style.RESET_ALL}")
+            return None
+
+        async with self._send_semaphore:
+            print(f"\n{Fore.CYAN}[{global_index}/{total_tracks}] Sending: {track.display_name}{Style.RESET_ALL}")
+
+            # Mark as sent immediately (before potential failure)
+            self._mark_sent(track.id)
+
+            # Send to bot
+            sent = await self.telegram.send_track_to_bot(track)
+
+        if sent:
+            self._sends_since_flood_wait += 1
+            if self._sends_since_flood_wait >= BatchConstants.SEND_RECOVERY_SUCCESSES:
+                self._sends_since_flood_wait = 0
+                self._send_semaphore.grow()
+            if self.on_track_sent:
+                self._schedule_callback(self.on_track_sent(track, global_index, total_tracks))
+        else:
+            self.progress_tracker.mark_track_failed(track.id, "Failed to send to bot")
+            self._settle(track.id)
+            if self.on_track_failed:
+                self._schedule_callback(self.on_track_failed(track, "Failed to send to bot"))
+        return sent
+
+    def _schedule_callback(self, callback) -> None:
+        """Run a progress callback coroutine without holding up the send path"""
+        task = asyncio.create_task(callback)
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
+
+    async def _drain_callbacks(self) -> None:
+        """Wait for scheduled progress callbacks, reporting any that raised"""
+        results = await asyncio.gather(*self._callback_tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"{Fore.YELLOW}Warning: progress callback failed: {result}{Style.RESET_ALL}")
+
+    def _handle_flood_wait(self) -> None:
+        """Narrow concurrent sends after Telegram signals a flood wait"""
+        self._sends_since_flood_wait = 0
+        self._send_semaphore.shrink()
+        if self.debug_mode:
+            print(f"{Fore.MAGENTA}DEBUG: Concurrent sends limited to {self._send_semaphore.limit}{Style.RESET_ALL}")
 
-            # Show progress (only if different from last message)
-            progress_message = f"Batch progress: {completed_count}/{len(batch_track_ids)} tracks completed"
+    def _settled_future(self, track_id: str) -> asyncio.Future:
+        """Future for the track's next completion or failure"""
+        future = self._settled.get(track_id)
+        # A settled track can be picked up again (a late file after a failure)
+        if future is None or future.done():
+            future = self._settled[track_id] = asyncio.get_running_loop().create_future()
+        return future
 
-            if progress_message != self.last_batch_progress_message:
-                self._clear_print(f"{Fore.YELLOW}{progress_message}{Style.RESET_ALL}")
-                self.last_batch_progress_message = progress_message
+    async def _wait_for_any_settled(self, track_ids: List[str], timeout: Optional[float]) -> None:
+        """
+        Return once any of the tracks next completes or fails, or after timeout.
 
-            await asyncio.sleep(5)  # Check every 5 seconds
+        Only a settle that happens after the call counts, so callers check
+        that the tracks are still in flight first.
+        """
+        # asyncio.wait leaves the futures alone on timeout; other waiters share them
+        await asyncio.wait(
+            [self._settled_future(track_id) for track_id in track_ids],
+            timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
 
-        # Final status check - inform user about incomplete tracks but DON'T mark as failed
-        # They will continue processing and can complete while next batch runs
+    def _mark_sent(self, track_id: str) -> None:
+        """Record a track as sent to the bot and awaiting its file"""
+        self.progress_tracker.mark_track_sent(track_id)
+        self._in_flight.add(track_id)
+
+    def _settle(self, track_id: str) -> None:
+        """Wake anything waiting for this track to complete or fail"""
+        self._in_flight.discard(track_id)
+        self._downloading.discard(track_id)
+        self._progress_changed.set()
+        future = self._settled.pop(track_id, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def _track_status(self, track_id: str) -> Optional[TrackStatus]:
+        """Current status of a track in this session, or None if it is not tracked"""
         session = self.progress_tracker.current_session
-        if session:
-            final_incomplete = []
-            for track_id in batch_track_ids:
-                if track_id in session.tracks:
-                    track_status = session.tracks[track_id].status
-                    if track_status not in [TrackStatus.COMPLETED, TrackStatus.FAILED]:
-                        final_incomplete.append(track_id)
-                else:
-                    final_incomplete.append(track_id)
-
-            if final_incomplete:
-                # Only show warning, don't mark as failed - let them continue processing
-                print(f"{Fore.YELLOW}  {len(final_incomplete)} track(s) will continue in background...{Style.RESET_ALL}")
-
-                if self.debug_mode:
-                    # Show which tracks are still processing
-                    for track_id in final_incomplete:
-                        if track_id in session.tracks:
-                            track_progress = session.tracks[track_id]
-                            print(f"{Fore.MAGENTA}  - Continuing: {track_progress.track_name} (Status: {track_progress.status.value}){Style.RESET_ALL}")
-                        else:
-                            track_name = "Unknown"
-                            for track in batch_tracks:
-                                if track.id == track_id:
-                                    track_name = f"{track.artist_string} - {track.name}"
-                                    break
-                            print(f"{Fore.MAGENTA}  - Not in session yet: {track_name}{Style.RESET_ALL}")
-    
+        track_progress = session.tracks.get(track_id) if session else None
+        return track_progress.status if track_progress else None
+
+    def _is_track_completed(self, track_id: str) -> bool:
+        """Check if track is already completed"""
+        return track_id in self._completed_ids
     
     async def _handle_file_downloaded(self, message, filename: str, track: Track, track_name: str):
         """
-        Handle file downloaded from Telegram.
+        Handle a file received from the bot by queueing it for download.
 
         This can be called for tracks from previous batches that are still completing.
         We should always try to complete the download regardless of batch timing.
@@ -837,16 +764,33 @@ class SpotifyDownloader:
                 print(f"{Fore.GREEN}Recovering track from timeout: {track_name}{Style.RESET_ALL}")
                 # Reset status - we're getting the file now!
 
-        # Update progress immediately
+        # Update progress immediately; queued files count as downloading so
+        # the final wait does not give up on them
         self.progress_tracker.mark_track_downloading(track.id)
+        self._in_flight.add(track.id)
+        self._downloading.add(track.id)
+        self._progress_changed.set()
         
         if self.debug_mode:
             print(f"{Fore.MAGENTA}DEBUG: Track marked as downloading{Style.RESET_ALL}")
-        
+
+        await self._download_queue.put((message, filename, track, track_name))
+
+    async def _download_worker(self) -> None:
+        """Take received files off the queue and download them one at a time"""
+        while True:
+            item = await self._download_queue.get()
+            try:
+                await self._download_and_store(*item)
+            finally:
+                self._download_queue.task_done()
+
+    async def _download_and_store(self, message, filename: str, track: Track, track_name: str):
+        """Download a received file, move it into the library and record it"""
         try:
             # Download file from Telegram to temp location
-            temp_path = Path(self.config.download_folder) / "temp" / filename
-            temp_path.parent.mkdir(exist_ok=True, parents=True)
+            # Prefixed with the track ID so concurrent downloads never share a temp file
+            temp_path = self.file_manager.allocate_temp_path(f"{track.id}_{filename}")
 
             download_success = await self.telegram.download_file(message, temp_path)
 
@@ -854,8 +798,12 @@ class SpotifyDownloader:
                 print(f"{Fore.MAGENTA}DEBUG: Download success: {download_success}{Style.RESET_ALL}")
             
             if download_success:
-                # Move to organized location
-                result = self.file_manager.move_to_organized_location(temp_path, track, filename)
+                # Move to organized location (disk I/O, so off the event loop)
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._io_executor,
+                    self.file_manager.move_to_organized_location, temp_path, track, filename
+                )
                 
                 if result.success:
                     self.progress_tracker.mark_track_completed(
@@ -863,14 +811,18 @@ class SpotifyDownloader:
                         str(result.filepath),
                         result.file_size
                     )
+                    self._completed_ids.add(track.id)
+                    self._settle(track.id)
 
                     # Add to catalog with spotify_id
                     try:
-                        self.catalog.add_track(
+                        # Reads the file's tags and writes SQLite; run in a thread
+                        await loop.run_in_executor(self._io_executor, partial(
+                            self.catalog.add_track,
                             result.filepath,
                             playlist_source=self.file_manager.current_playlist_name or '',
                             spotify_id=track.id
-                        )
+                        ))
                     except Exception as e:
                         if self.debug_mode:
                             print(f"  Warning: Failed to catalog track: {e}")
@@ -883,12 +835,14 @@ class SpotifyDownloader:
                     error_msg = result.error_message or "Failed to organize file"
                     print(f"{Fore.RED}Failed to organize file: {error_msg}{Style.RESET_ALL}")
                     self.progress_tracker.mark_track_failed(track.id, error_msg)
+                    self._settle(track.id)
                     if self.on_track_failed:
                         await self.on_track_failed(track, error_msg)
             else:
                 error_msg = "Failed to download from Telegram"
                 print(f"{Fore.RED}{error_msg}{Style.RESET_ALL}")
                 self.progress_tracker.mark_track_failed(track.id, error_msg)
+                self._settle(track.id)
                 if self.on_track_failed:
                     await self.on_track_failed(track, error_msg)
                 
@@ -896,15 +850,17 @@ class SpotifyDownloader:
             error_msg = f"Error processing download: {e}"
             print(f"{Fore.RED}{error_msg}{Style.RESET_ALL}")
             self.progress_tracker.mark_track_failed(track.id, error_msg)
+            self._settle(track.id)
             if self.on_track_failed:
                 await self.on_track_failed(track, error_msg)
     
     async def _handle_download_failed(self, track: Track, error_message: str):
         """Handle download failure"""
-        self._clear_print(f"{Fore.RED}Download failed: {track.artist_string} - {track.name}{Style.RESET_ALL}")
+        self._clear_print(f"{Fore.RED}Download failed: {track.display_name}{Style.RESET_ALL}")
         print(f"{Fore.RED}Error: {error_message}{Style.RESET_ALL}")
 
         self.progress_tracker.mark_track_failed(track.id, error_message)
+        self._settle(track.id)
 
         # Clean up any orphaned pending requests when a track fails (thread-safe)
         if self.telegram:
@@ -954,11 +910,20 @@ class SpotifyDownloader:
     
     async def cleanup(self):
         """Clean up all resources"""
+        for worker in self._download_workers:
+            worker.cancel()
+        self._download_workers = []
+
+        # Persist any status changes not yet written
+        await asyncio.to_thread(self.progress_tracker.flush)
+
         if self.telegram:
             await self.telegram.cleanup()
         
         # Clean up temporary files
         self.file_manager.cleanup_temp_files()
+
+        self._io_executor.shutdown(wait=False)
     
     def set_progress_callbacks(self, 
                              on_track_sent: Optional[Callable] = None,
@@ -1007,4 +972,4 @@ if __name__ == "__main__":
             if 'downloader' in locals():
                 await downloader.cleanup()
     
-    asyncio.run(main())
+    run_async(main())
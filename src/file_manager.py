@@ -10,15 +10,37 @@ Handles file operations including:
 - Metadata preservation
 """
 
-import re
-import hashlib
+import os
+import math
+import errno
+import shutil
+import threading
+from collections import Counter, defaultdict
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, Iterable, List, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 from .spotify_api import Track
-from .utils import sanitize_filename as _sanitize_filename
+from .utils import (
+    normalize_filename as _normalize_filename,
+    sanitize_filename as _sanitize_filename,
+)
+
+
+# Filenames whose normalized token sets are more similar than this are duplicates
+DUPLICATE_SIMILARITY = 0.9
+
+
+# Read size for side-by-side file comparison
+_COMPARE_CHUNK_SIZE = 1024 * 1024
+
+
+def _advise_sequential(f) -> None:
+    """Hint the kernel to read ahead aggressively (no-op where unsupported)"""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
 
 
 @dataclass
@@ -30,11 +52,13 @@ class FileConfig:
     create_year_folders: bool = False
     max_filename_length: int = 200
     preserve_original_filename: bool = False
-    allowed_extensions: List[str] = None
+    allowed_extensions: Optional[Iterable[str]] = None
     
     def __post_init__(self):
         if self.allowed_extensions is None:
             self.allowed_extensions = ['.flac', '.mp3', '.wav', '.m4a', '.ogg']
+        # Checked once per file; a frozenset makes each check a hash lookup
+        self.allowed_extensions = frozenset(self.allowed_extensions)
 
 
 @dataclass
@@ -50,22 +74,46 @@ class DownloadResult:
 
 class FileManager:
     """Manages file downloads and organization"""
+
+    __slots__ = (
+        'config', 'download_folder', 'temp_dir',
+        'current_playlist_name', '_playlist_dir',
+        'total_downloaded', 'total_size_bytes', 'duplicates_skipped', 'errors',
+        '_filename_cache', '_known_dirs', '_move_lock',
+    )
     
     def __init__(self, config: FileConfig):
         self.config = config
+        # Created lazily (with parents) by the first write, so read-only uses
+        # such as find_duplicates() or get_stats() leave the disk untouched
         self.download_folder = Path(config.download_folder)
-        self.download_folder.mkdir(exist_ok=True, parents=True)
+
+        # Downloads land here first; it sits under the download folder so the
+        # final move is a same-filesystem rename rather than a copy
+        self.temp_dir = self.download_folder / "temp"
         
-        # Playlist organization
+        # Playlist organization; the folder is resolved once per playlist.
+        # Without a playlist name, "Unknown Playlist" keeps the structure consistent
         self.current_playlist_name = None
+        self._playlist_dir = self.download_folder / "Unknown Playlist"
         
-        # Statistics
-        self.download_stats = {
-            'total_downloaded': 0,
-            'total_size_bytes': 0,
-            'duplicates_skipped': 0,
-            'errors': 0
-        }
+        # Statistics (reported as a dict by get_stats)
+        self.total_downloaded = 0
+        self.total_size_bytes = 0
+        self.duplicates_skipped = 0
+        self.errors = 0
+
+        # Generated filenames by (track id, original filename); the check,
+        # path and move steps all ask for the same track's name
+        self._filename_cache: Dict[Tuple[str, Optional[str]], str] = {}
+
+        # Directories already created this run, so each is mkdir'd only once
+        self._known_dirs: Set[Path] = set()
+
+        # Moves run on worker threads; picking a free name and renaming onto it
+        # must happen as one step, or two tracks with the same name overwrite
+        # each other. Also guards the statistics counters
+        self._move_lock = threading.Lock()
     
     @staticmethod
     def sanitize_filename(filename: str, max_length: int = 200) -> str:
@@ -75,31 +123,53 @@ class FileManager:
     def set_playlist_name(self, playlist_name: str):
         """Set the current playlist name for file organization"""
         self.current_playlist_name = playlist_name
+        if playlist_name:
+            playlist_folder = self.sanitize_filename(playlist_name, 100)
+            self._playlist_dir = self.download_folder / playlist_folder
+        else:
+            self._playlist_dir = self.download_folder / "Unknown Playlist"
     
     def get_organized_path(self, track: Track, filename: str) -> Path:
         """Get the organized file path based on configuration"""
-        base_path = self.download_folder
-        
-        # Always use playlist name for organization when available
-        if self.current_playlist_name:
-            playlist_folder = self.sanitize_filename(self.current_playlist_name, 100)
-            base_path = base_path / playlist_folder
-        else:
-            # If no playlist name, use "Unknown Playlist" to maintain consistent structure
-            base_path = base_path / "Unknown Playlist"
-        
-        # Create directory if it doesn't exist
-        base_path.mkdir(parents=True, exist_ok=True)
-        
-        return base_path / filename
+        return self._directory_for(track) / filename
+
+    def _directory_for(self, track: Track) -> Path:
+        """Target directory for a track, without building its filename"""
+        # Always the playlist folder, resolved once in set_playlist_name
+        return self._playlist_dir
+
+    def prepare_directories(self, tracks: Iterable[Track]):
+        """Create every target directory for a batch of tracks up front, once each"""
+        directories = {self._directory_for(track) for track in tracks}
+        directories.add(self.temp_dir)
+        for directory in directories:
+            self._ensure_dir(directory)
+
+    def allocate_temp_path(self, filename: str) -> Path:
+        """Get the temporary download path for a file, creating the temp dir if needed"""
+        self._ensure_dir(self.temp_dir)
+        return self.temp_dir / filename
+
+    def _ensure_dir(self, directory: Path):
+        """Create a directory unless it was already created this run"""
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
     
     def generate_filename(self, track: Track, original_filename: Optional[str] = None) -> str:
-        """Generate filename for track"""
+        """Generate filename for track, reusing the result for repeat calls"""
+        key = (track.id, original_filename)
+        filename = self._filename_cache.get(key)
+        if filename is None:
+            filename = self._filename_cache[key] = self._build_filename(track, original_filename)
+        return filename
+
+    def _build_filename(self, track: Track, original_filename: Optional[str]) -> str:
         if self.config.preserve_original_filename and original_filename:
             return self.sanitize_filename(original_filename, self.config.max_filename_length)
         
         # Generate filename from track metadata
-        artist_part = ", ".join(track.artists) if track.artists else "Unknown Artist"
+        artist_part = track.artist_string or "Unknown Artist"
         track_name = track.name or "Unknown Track"
         
         # Create filename: "Artist - Track Name.ext"
@@ -142,30 +212,30 @@ class FileManager:
         name_stem = filepath.stem
         extension = filepath.suffix
         
-        counter = 1
-        while True:
+        # One directory read instead of an exists() call per candidate
+        with os.scandir(base_path) as entries:
+            taken = {entry.name for entry in entries}
+        
+        for counter in range(1, 1001):
             new_name = f"{name_stem} ({counter}){extension}"
-            new_path = base_path / new_name
-            
-            if not new_path.exists():
-                return new_path
-            
-            counter += 1
-            
-            # Safety check to prevent infinite loop
-            if counter > 1000:
-                # Use timestamp as last resort
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                new_name = f"{name_stem}_{timestamp}{extension}"
+            if new_name not in taken:
                 return base_path / new_name
+        
+        # Use timestamp as last resort
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        new_name = f"{name_stem}_{timestamp}{extension}"
+        return base_path / new_name
     
     def validate_file(self, filepath: Path, min_size_bytes: int = 1024) -> bool:
         """Validate downloaded file"""
-        if not filepath.exists():
+        # One stat() covers both the existence and the size check
+        try:
+            file_size = os.stat(filepath).st_size
+        except OSError:
             return False
         
         # Check file size
-        if filepath.stat().st_size < min_size_bytes:
+        if file_size < min_size_bytes:
             return False
         
         # Check file extension
@@ -181,35 +251,45 @@ class FileManager:
     
     def move_to_organized_location(self, temp_path: Path, track: Track, 
                                  original_filename: Optional[str] = None) -> DownloadResult:
-        """Move file from temporary location to organized location"""
+        """Move file from temporary location to organized location (thread-safe)"""
         try:
             # Generate final path
             final_path = self.get_download_path(track, original_filename)
             
-            # Handle filename collisions
-            if final_path.exists():
-                # Check if it's the same file (by size and content hash)
-                if self._files_are_identical(temp_path, final_path):
-                    temp_path.unlink()  # Remove temp file
-                    self.download_stats['duplicates_skipped'] += 1
-                    return DownloadResult(
-                        success=True,
-                        filepath=final_path,
-                        already_exists=True,
-                        file_size=final_path.stat().st_size
-                    )
-                else:
+            # Same file already there? Comparing reads both files, so it runs
+            # outside the lock and concurrent moves overlap here
+            if final_path.exists() and self._files_are_identical(temp_path, final_path):
+                temp_path.unlink()  # Remove temp file
+                with self._move_lock:
+                    self.duplicates_skipped += 1
+                return DownloadResult(
+                    success=True,
+                    filepath=final_path,
+                    already_exists=True,
+                    file_size=final_path.stat().st_size
+                )
+            
+            # Picking a free name and renaming onto it happen as one step
+            with self._move_lock:
+                if final_path.exists():
                     # Different file with same name
                     final_path = self.handle_filename_collision(final_path)
-            
-            # Move file to final location
-            final_path.parent.mkdir(parents=True, exist_ok=True)
-            temp_path.rename(final_path)
+                
+                # Move file to final location
+                self._ensure_dir(final_path.parent)
+                try:
+                    os.replace(temp_path, final_path)
+                except OSError as e:
+                    # Temp file on another filesystem: fall back to copy + delete
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(temp_path, final_path)
             
             # Validate the moved file
             if not self.validate_file(final_path):
                 final_path.unlink()
-                self.download_stats['errors'] += 1
+                with self._move_lock:
+                    self.errors += 1
                 return DownloadResult(
                     success=False,
                     error_message="File validation failed after move"
@@ -217,8 +297,9 @@ class FileManager:
             
             # Update statistics
             file_size = final_path.stat().st_size
-            self.download_stats['total_downloaded'] += 1
-            self.download_stats['total_size_bytes'] += file_size
+            with self._move_lock:
+                self.total_downloaded += 1
+                self.total_size_bytes += file_size
             
             return DownloadResult(
                 success=True,
@@ -227,121 +308,160 @@ class FileManager:
             )
             
         except Exception as e:
-            self.download_stats['errors'] += 1
+            with self._move_lock:
+                self.errors += 1
             return DownloadResult(
                 success=False,
                 error_message=f"Error moving file: {e}"
             )
     
     def _files_are_identical(self, path1: Path, path2: Path) -> bool:
-        """Check if two files are identical by size and hash"""
+        """Check if two files are identical by size and content"""
         try:
             # Quick size check first
             if path1.stat().st_size != path2.stat().st_size:
                 return False
             
-            # Hash comparison for smaller files
-            if path1.stat().st_size < 50 * 1024 * 1024:  # 50MB
-                return self._get_file_hash(path1) == self._get_file_hash(path2)
-            
-            # For larger files, assume they're different if sizes match
-            # (to avoid long hash computation)
-            return True
+            # Compare chunk by chunk, stopping at the first difference.
+            # bytearray == bytearray is a memcmp; memoryview == memoryview
+            # compares item by item and is several times slower
+            buffer1 = bytearray(_COMPARE_CHUNK_SIZE)
+            buffer2 = bytearray(_COMPARE_CHUNK_SIZE)
+
+            with open(path1, 'rb') as f1, open(path2, 'rb') as f2:
+                _advise_sequential(f1)
+                _advise_sequential(f2)
+                while True:
+                    read1 = f1.readinto(buffer1)
+                    read2 = f2.readinto(buffer2)
+                    if read1 != read2:
+                        return False
+                    if read1 < _COMPARE_CHUNK_SIZE:
+                        return buffer1[:read1] == buffer2[:read2]
+                    if buffer1 != buffer2:
+                        return False
             
         except Exception:
             return False
     
-    def _get_file_hash(self, filepath: Path, chunk_size: int = 8192) -> str:
-        """Get MD5 hash of file"""
-        hasher = hashlib.md5()
-        
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                hasher.update(chunk)
-        
-        return hasher.hexdigest()
-    
     def cleanup_temp_files(self, temp_dir: Optional[Path] = None):
         """Clean up temporary files"""
         if temp_dir is None:
-            temp_dir = self.download_folder / "temp"
+            temp_dir = self.temp_dir
+        
+        # DirEntry.is_file() is answered from the directory listing itself,
+        # so only the unlink() calls touch individual files
+        try:
+            entries = os.scandir(temp_dir)
+        except FileNotFoundError:
+            return
         
-        if temp_dir.exists():
-            for temp_file in temp_dir.glob("*"):
+        with entries:
+            for entry in entries:
                 try:
-                    if temp_file.is_file():
-                        temp_file.unlink()
+                    if entry.is_file():
+                        os.unlink(entry.path)
                 except Exception as e:
-                    print(f"Warning: Could not clean up {temp_file}: {e}")
+                    print(f"Warning: Could not clean up {entry.path}: {e}")
     
     def get_stats(self) -> Dict:
         """Get download statistics"""
-        stats = self.download_stats.copy()
-        
         # Add human-readable size
-        size_mb = stats['total_size_bytes'] / (1024 * 1024)
-        stats['total_size_mb'] = round(size_mb, 2)
-        
-        return stats
+        size_mb = self.total_size_bytes / (1024 * 1024)
+        
+        return {
+            'total_downloaded': self.total_downloaded,
+            'total_size_bytes': self.total_size_bytes,
+            'duplicates_skipped': self.duplicates_skipped,
+            'errors': self.errors,
+            'total_size_mb': round(size_mb, 2),
+        }
     
     def get_downloaded_files(self) -> List[Path]:
-        """Get list of all downloaded files"""
-        files = []
-        
-        for ext in self.config.allowed_extensions:
-            files.extend(self.download_folder.rglob(f"*{ext}"))
+        """Get list of all downloaded files, newest first"""
+        files: List[Tuple[str, float]] = []
+        self._collect_downloaded(str(self.download_folder), tuple(self.config.allowed_extensions), files)
         
-        return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+        files.sort(key=itemgetter(1), reverse=True)
+        return [Path(path) for path, _ in files]
+
+    def _collect_downloaded(self, directory: str, extensions: Tuple[str, ...],
+                            out: List[Tuple[str, float]]):
+        """Append (path, mtime) for audio files under a directory, in one walk for all extensions"""
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        
+        subdirs = []
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(extensions):
+                    out.append((entry.path, entry.stat().st_mtime))
+        
+        for subdir in subdirs:
+            self._collect_downloaded(subdir, extensions, out)
     
     def find_duplicates(self) -> List[Tuple[Path, Path]]:
-        """Find potential duplicate files based on filename similarity"""
+        """
+        Find potential duplicate files based on filename similarity.
+
+        Uses prefix filtering instead of comparing every pair: with tokens
+        sorted rarest-first, two names can only exceed the Jaccard threshold
+        if their short prefixes share a token, so only files sharing a
+        prefix token are compared.
+        """
         files = self.get_downloaded_files()
-        duplicates = []
-        
-        for i, file1 in enumerate(files):
-            for file2 in files[i+1:]:
-                # Compare normalized filenames
-                name1 = self._normalize_filename(file1.stem)
-                name2 = self._normalize_filename(file2.stem)
-                
-                # Check similarity (simple string matching)
-                if self._similarity_ratio(name1, name2) > 0.9:
-                    duplicates.append((file1, file2))
-        
-        return duplicates
+
+        # Normalize and tokenize each name once; pairs then compare the
+        # precomputed sets instead of re-splitting both strings
+        names = [self._normalize_filename(f.stem) for f in files]
+        token_sets = [frozenset(name.split()) for name in names]
+        frequency = Counter(token for tokens in token_sets for token in tokens)
+
+        # Number tokens rarest-first and pack each set into an int bitmask:
+        # overlap is then one C-level AND plus a popcount per candidate pair
+        token_ids = {token: n for n, token in enumerate(
+            sorted(frequency, key=lambda t: (frequency[t], t)))}
+        masks = [sum(1 << token_ids[t] for t in tokens) for tokens in token_sets]
+
+        prefix_index: Dict[int, List[int]] = defaultdict(list)
+        matches = []
+
+        for i, tokens in enumerate(token_sets):
+            ordered = sorted(token_ids[t] for t in tokens)
+            prefix_length = len(ordered) - math.ceil(DUPLICATE_SIMILARITY * len(ordered)) + 1
+            # Empty names all land in the -1 block, which no token id uses
+            prefix = ordered[:prefix_length] or (-1,)
+
+            candidates = set()
+            for token_id in prefix:
+                candidates.update(prefix_index[token_id])
+                prefix_index[token_id].append(i)
+
+            mask, size = masks[i], len(tokens)
+            for j in candidates:
+                if names[j] == names[i]:
+                    matches.append((j, i))
+                    continue
+                # Jaccard can't exceed min/max of the set sizes; skip lopsided pairs
+                other_size = len(token_sets[j])
+                if min(size, other_size) <= DUPLICATE_SIMILARITY * max(size, other_size):
+                    continue
+                overlap = (masks[j] & mask).bit_count()
+                union = other_size + size - overlap
+                if union and overlap / union > DUPLICATE_SIMILARITY:
+                    matches.append((j, i))
+
+        # Same pair order as a full pairwise scan over the mtime-sorted files
+        matches.sort()
+        return [(files[j], files[i]) for j, i in matches]
     
     def _normalize_filename(self, filename: str) -> str:
-        """Normalize filename for duplicate detection"""
-        # Convert to lowercase
-        filename = filename.lower()
-        
-        # Remove common patterns
-        patterns_to_remove = [
-            r'\s*\([^)]*\)\s*',  # Remove parentheses content
-            r'\s*\[[^\]]*\]\s*',  # Remove brackets content
-            r'\s*-\s*copy\s*',    # Remove "copy" indicators
-            r'\s+',               # Normalize whitespace
-        ]
-        
-        for pattern in patterns_to_remove:
-            filename = re.sub(pattern, ' ', filename)
-        
-        return filename.strip()
-    
-    def _similarity_ratio(self, str1: str, str2: str) -> float:
-        """Calculate similarity ratio between two strings"""
-        # Simple implementation - could use more sophisticated algorithms
-        if str1 == str2:
-            return 1.0
-        
-        # Calculate Jaccard similarity
-        set1 = set(str1.split())
-        set2 = set(str2.split())
-        
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        
-        return intersection / union if union > 0 else 0.0
+        """Normalize filename for duplicate detection. Delegates to utils.normalize_filename."""
+        return _normalize_filename(filename)
 
 
 def create_file_manager(download_folder: str = "./downloads", **kwargs) -> FileManager:
@@ -13,6 +13,7 @@ import time
 from typing import Optional, Dict, List
 
 import requests
+from tqdm import tqdm
 
 from .spotify_api import Track
 
@@ -156,9 +157,12 @@ class LinkConverter:
         if uncached_tracks:
             print(f"  Looking up {len(uncached_tracks)} tracks via Tidal API...")
 
-        # Second pass: fetch from Tidal API
-        for i, track in enumerate(uncached_tracks, 1):
-            track_name = f"{track.artist_string} - {track.name}"
+        # Second pass: fetch from Tidal API. A single tqdm status line replaces
+        # periodic progress prints; debug mode keeps its per-track lines instead.
+        progress = tqdm(uncached_tracks, desc="  Tidal lookup", unit="track",
+                        leave=False, disable=debug or not uncached_tracks)
+        for i, track in enumerate(progress, 1):
+            track_name = track.display_name
             if debug:
                 print(f"  [{i}/{len(uncached_tracks)}] {track_name}", end="")
 
@@ -177,9 +181,8 @@ class LinkConverter:
                 if debug:
                     print(" -> not found")
 
-            # Progress every 10 tracks (non-debug)
-            if not debug and i % 10 == 0:
-                print(f"  Progress: {i}/{len(uncached_tracks)}...")
+            progress.set_postfix(found=fetched, missing=not_found, refresh=False)
+        progress.close()
 
         print(f"  Tidal links: {cached} cached, {fetched} found, {not_found} not on Tidal")
         return results
@@ -11,14 +11,25 @@ Handles progress tracking and session management including:
 """
 
 import json
+import mmap
 import time
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, TextIO
+from dataclasses import dataclass, fields, is_dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 
-from .spotify_api import Track
+from .async_writer import AsyncArtifactWriter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if TYPE_CHECKING:
+    from .spotify_api import Track
 
 
 class TrackStatus(Enum):
@@ -31,7 +42,15 @@ class TrackStatus(Enum):
     SKIPPED = "skipped"
 
 
-@dataclass
+# Outcomes that are written to disk as soon as they happen. Intermediate
+# states are only marked dirty: a resumed session resets them to pending anyway.
+_PERSIST_IMMEDIATELY = frozenset({TrackStatus.COMPLETED, TrackStatus.FAILED, TrackStatus.SKIPPED})
+
+# Progress files larger than this are parsed from a memory map instead of a copy
+_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+@dataclass(slots=True)
 class TrackProgress:
     """Progress information for a single track"""
     track_id: str
@@ -46,6 +65,10 @@ class TrackProgress:
     download_time: float = 0.0
     sent_to_bot_at: Optional[str] = None
     completed_at: Optional[str] = None
+    # Stored separately so resume does not have to parse track_name;
+    # empty in progress files written before they were added
+    artist: str = ''
+    title: str = ''
 
 
 @dataclass
@@ -65,18 +88,42 @@ class SessionProgress:
             self.tracks = {}
 
 
+def _json_default(obj):
+    """json.dumps hook: dataclasses become dicts and enums their values"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class ProgressTracker:
     """Manages progress tracking and session persistence"""
     
     def __init__(self, progress_file: str = "progress.json"):
         self.progress_file = Path(progress_file)
+        # Append-only history of every failed attempt (one JSON object per line)
+        self.failures_file = self.progress_file.with_name(f"{self.progress_file.stem}.failures.jsonl")
         self.current_session: Optional[SessionProgress] = None
+
+        # Unsaved in-memory changes
+        self._dirty = False
+
+        # When set, final outcomes are only marked dirty too and the owner is
+        # responsible for calling flush() periodically
+        self.defer_saves = False
+        # Serializes snapshots so a flush in a worker thread never races another
+        self._save_lock = threading.Lock()
+        # Does the disk writes off the caller's thread; started on first save
+        self._writer: Optional[AsyncArtifactWriter] = None
+        # Line-buffered append handle for the failures log, opened on first failure
+        self._failures_log: Optional[TextIO] = None
         
         # Statistics
         self._stats_cache = None
         self._stats_last_updated = 0
     
-    def start_session(self, playlist_url: str, playlist_name: str, tracks: List[Track]) -> str:
+    def start_session(self, playlist_url: str, playlist_name: str, tracks: List['Track']) -> str:
         """Start a new download session"""
         session_id = self._generate_session_id()
         
@@ -94,9 +141,11 @@ class ProgressTracker:
         for track in tracks:
             track_progress = TrackProgress(
                 track_id=track.id,
-                track_name=f"{track.artist_string} - {track.name}",
+                track_name=track.display_name,
                 track_url=track.url,
-                status=TrackStatus.PENDING
+                status=TrackStatus.PENDING,
+                artist=track.artist_string,
+                title=track.name
             )
             self.current_session.tracks[track.id] = track_progress
         
@@ -109,9 +158,8 @@ class ProgressTracker:
             return None
         
         try:
-            with open(self.progress_file, 'r') as f:
-                data = json.load(f)
-            
+            data = self._read_progress_data()
+
             # Handle legacy format or find specific session
             if session_id:
                 # Look for specific session (future enhancement)
@@ -135,35 +183,64 @@ class ProgressTracker:
             print(f"Warning: Could not load progress file: {e}")
             return None
     
+    def _read_progress_data(self) -> dict:
+        """Parse the progress file from raw bytes, skipping the text decode step"""
+        if not ORJSON_AVAILABLE:
+            return json.loads(self.progress_file.read_bytes())
+
+        if self.progress_file.stat().st_size <= _MMAP_THRESHOLD:
+            return orjson.loads(self.progress_file.read_bytes())
+
+        # Large resumed sessions: parse straight from the page cache
+        with open(self.progress_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            return orjson.loads(view)
+
     def save_progress(self):
         """Save current session progress to file"""
+        with self._save_lock:
+            self._save_progress_locked()
+
+    def _save_progress_locked(self):
         if not self.current_session:
             return
         
         self.current_session.last_updated = datetime.now().isoformat()
         
-        # Convert to dict for JSON serialization
-        session_dict = asdict(self.current_session)
-        
-        # Convert TrackProgress objects and enums to dicts
-        tracks_dict = {}
-        for track_id, track_progress in self.current_session.tracks.items():
-            track_dict = asdict(track_progress)
-            track_dict['status'] = track_progress.status.value
-            tracks_dict[track_id] = track_dict
-        
-        session_dict['tracks'] = tracks_dict
+        # Cleared before serializing so changes made meanwhile (flush may run
+        # in a worker thread) mark the tracker dirty again
+        self._dirty = False
         
         try:
-            # Atomic write to prevent corruption
-            temp_file = self.progress_file.with_suffix('.tmp')
-            with open(temp_file, 'w') as f:
-                json.dump(session_dict, f, indent=2)
-            
-            temp_file.rename(self.progress_file)
-            
+            # The session is serialized as-is: orjson handles dataclasses and
+            # enums natively; the stdlib fallback converts them via _json_default
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(self.current_session)
+            else:
+                data = json.dumps(
+                    self.current_session, default=_json_default, separators=(',', ':')
+                ).encode()
+            # The writer does an atomic, fsynced replace in the background
+            self._get_writer().submit(data)
+
         except Exception as e:
-            print(f"Warning: Could not save progress: {e}")
+            self._on_write_error(e)
+
+    def _get_writer(self) -> AsyncArtifactWriter:
+        if self._writer is None:
+            self._writer = AsyncArtifactWriter(str(self.progress_file), on_error=self._on_write_error)
+        return self._writer
+
+    def _on_write_error(self, error: Exception):
+        # Keep the changes marked unsaved so the next flush tries again
+        self._dirty = True
+        print(f"Warning: Could not save progress: {error}")
+
+    def wait_for_writes(self):
+        """Block until every save so far has reached the disk"""
+        if self._writer:
+            self._writer.flush()
     
     def update_track_status(self, track_id: str, status: TrackStatus, 
                           error_message: Optional[str] = None,
@@ -184,6 +261,7 @@ class ProgressTracker:
         if status == TrackStatus.FAILED:
             track.attempts += 1
             track.error_message = error_message
+            self._log_failure(track)
         elif status == TrackStatus.COMPLETED:
             track.completed_at = datetime.now().isoformat()
             track.file_path = file_path
@@ -192,8 +270,41 @@ class ProgressTracker:
         elif status == TrackStatus.SENT_TO_BOT:
             track.sent_to_bot_at = datetime.now().isoformat()
         
-        self.save_progress()
+        self._dirty = True
+        if status in _PERSIST_IMMEDIATELY and not self.defer_saves:
+            self.save_progress()
         self._invalidate_stats_cache()
+
+    def _log_failure(self, track: TrackProgress):
+        """Append one failed attempt to the failures log"""
+        entry = {
+            'session_id': self.current_session.session_id,
+            'track_id': track.track_id,
+            'track_name': track.track_name,
+            'attempt': track.attempts,
+            'error_message': track.error_message,
+            'failed_at': track.last_attempt,
+        }
+        line = orjson.dumps(entry).decode() if ORJSON_AVAILABLE else json.dumps(entry)
+
+        try:
+            if self._failures_log is None:
+                self._failures_log = open(self.failures_file, 'a', encoding='utf-8', buffering=1)
+            self._failures_log.write(line + '\n')
+        except OSError as e:
+            print(f"Warning: Could not write failures log: {e}")
+
+    def _close_failures_log(self):
+        """Close the failures log handle; the next failure reopens it"""
+        if self._failures_log is not None:
+            self._failures_log.close()
+            self._failures_log = None
+
+    def flush(self):
+        """Write any unsaved changes to disk and wait for the write to finish"""
+        if self._dirty:
+            self.save_progress()
+        self.wait_for_writes()
     
     def mark_track_sent(self, track_id: str):
         """Mark track as sent to bot"""
@@ -258,12 +369,13 @@ class ProgressTracker:
         if not self.current_session:
             return {}
         
-        tracks = self.current_session.tracks.values()
-        
-        # Count by status
-        status_counts = {}
-        for status in TrackStatus:
-            status_counts[status.value] = len(self.get_tracks_by_status(status))
+        # Count by status and sum downloaded bytes in a single pass
+        status_counts = {status.value: 0 for status in TrackStatus}
+        total_size = 0
+        for track in self.current_session.tracks.values():
+            status_counts[track.status.value] += 1
+            if track.status == TrackStatus.COMPLETED and track.file_size > 0:
+                total_size += track.file_size
         
         # Calculate completion percentage
         total = self.current_session.total_tracks
@@ -275,12 +387,6 @@ class ProgressTracker:
         completion_percentage = (processed / total * 100) if total > 0 else 0
         success_rate = (completed / processed * 100) if processed > 0 else 0
         
-        # Calculate total download size
-        total_size = sum(
-            track.file_size for track in tracks 
-            if track.status == TrackStatus.COMPLETED and track.file_size > 0
-        )
-        
         # Calculate session duration
         started = datetime.fromisoformat(self.current_session.started_at)
         if self.current_session.completed_at:
@@ -323,12 +429,19 @@ class ProgressTracker:
         if self.current_session:
             self.current_session.completed_at = datetime.now().isoformat()
             self.save_progress()
+            self.wait_for_writes()
+            self._close_failures_log()
             self._invalidate_stats_cache()
     
     def reset_progress(self):
         """Reset all progress data"""
+        # A write still in flight would recreate the file after the unlink
+        self.wait_for_writes()
+        self._close_failures_log()
         if self.progress_file.exists():
             self.progress_file.unlink()
+        if self.failures_file.exists():
+            self.failures_file.unlink()
         
         self.current_session = None
         self._invalidate_stats_cache()
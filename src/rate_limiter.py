@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Module
+
+Async token bucket used to pace outgoing Telegram messages:
+- Waits *before* each send instead of sleeping after it
+- Shared by all concurrent senders, so parallel batches cannot burst
+- Can be penalized after a server-side flood wait, pausing every sender
+
+Also provides an adjustable semaphore that narrows the number of sends in
+flight after a flood wait and widens it back as sends succeed again.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Async token bucket on the monotonic clock.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each ``acquire()`` takes one token, waiting until one is available.
+    With the default capacity of 1, consecutive acquisitions are spaced at
+    least ``1 / rate`` seconds apart.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second (must be positive)
+            capacity: Maximum burst size
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_interval(cls, interval: float) -> 'TokenBucket':
+        """Create a bucket allowing one acquisition every ``interval`` seconds"""
+        return cls(rate=1.0 / interval, capacity=1.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def penalize(self, seconds: float) -> None:
+        """Block all acquisitions for ``seconds`` and drop any saved-up burst"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0.0)
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until it is available"""
+        # Holding the lock while sleeping queues waiters in FIFO order
+        async with self._lock:
+            # A penalty can arrive during either sleep, so both conditions are
+            # re-checked after every wake-up before the token is taken
+            while True:
+                blocked_for = self._blocked_until - time.monotonic()
+                if blocked_for > 0:
+                    await asyncio.sleep(blocked_for)
+                    # The penalty replaces refill time; start counting from here
+                    self._updated = time.monotonic()
+                    continue
+
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdjustableSemaphore:
+    """
+    Async semaphore whose limit can shrink and grow at runtime.
+
+    The limit never exceeds the ``max_limit`` it was created with; shrinking
+    only affects new acquisitions, holders keep their slot until release.
+    """
+
+    def __init__(self, max_limit: int):
+        """
+        Args:
+            max_limit: Initial and maximum number of concurrent holders
+        """
+        if max_limit < 1:
+            raise ValueError(f"max_limit must be at least 1, got {max_limit}")
+
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self._in_use = 0
+        self._waiters: deque = deque()
+
+    def shrink(self) -> None:
+        """Halve the limit (never below 1)"""
+        self.limit = max(1, self.limit // 2)
+
+    def grow(self) -> None:
+        """Raise the limit by one, up to max_limit"""
+        if self.limit < self.max_limit:
+            self.limit += 1
+            self._wake()
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in FIFO order while the limit is reached"""
+        if self._in_use < self.limit and not self._waiters:
+            self._in_use += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just before the cancellation; pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Give a slot back and hand it to the next waiter"""
+        self._in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_use += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
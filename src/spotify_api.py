@@ -11,16 +11,24 @@ Handles all Spotify Web API interactions including:
 """
 
 import re
+import hashlib
 import time
 import json
 import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Union
-from dataclasses import dataclass
+from typing import Iterator, List, Dict, Optional, Tuple, Union
+from dataclasses import dataclass, asdict
+from functools import cached_property
 from datetime import datetime, timedelta
 
+import requests
 import spotipy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
+from spotipy.cache_handler import CacheFileHandler, MemoryCacheHandler
 from spotipy.exceptions import SpotifyException
 
 from src.utils import sanitize_filename as _sanitize_filename
@@ -41,11 +49,17 @@ class Track:
     release_date: str = ""
     isrc: Optional[str] = None
 
-    @property
+    # Computed once per track; artists and name are never reassigned after creation
+    @cached_property
     def artist_string(self) -> str:
         """Return artists as comma-separated string"""
         return ", ".join(self.artists)
 
+    @cached_property
+    def display_name(self) -> str:
+        """Return "Artists - Title" as shown in logs and progress"""
+        return f"{self.artist_string} - {self.name}"
+
     @property
     def duration_formatted(self) -> str:
         """Return duration in MM:SS format"""
@@ -56,7 +70,50 @@ class Track:
     @property
     def filename_safe_name(self) -> str:
         """Return filename-safe version of track name"""
-        return _sanitize_filename(f"{self.artist_string} - {self.name}")
+        return _sanitize_filename(self.display_name)
+
+
+# Playlist items per request (Spotify API maximum)
+PLAYLIST_PAGE_SIZE = 100
+
+# Concurrent page requests when fetching large playlists
+PLAYLIST_FETCH_WORKERS = 5
+
+# Status codes retried by the shared HTTP session (spotipy's defaults)
+_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Spotify ID extractors per content type, compiled once
+_SPOTIFY_ID_PATTERNS = {
+    'playlist': re.compile(r'playlist[/:]([a-zA-Z0-9]+)'),
+    'album': re.compile(r'album[/:]([a-zA-Z0-9]+)'),
+    'track': re.compile(r'track[/:]([a-zA-Z0-9]+)'),
+    'artist': re.compile(r'artist[/:]([a-zA-Z0-9]+)'),
+}
+
+
+def _build_http_session() -> requests.Session:
+    """
+    Create the pooled HTTP session shared by the Spotify auth and API clients.
+
+    spotipy only mounts its retrying adapter on sessions it builds itself,
+    so the same retry policy is applied here. The pool holds a connection
+    per concurrent page fetch, so parallel pagination never discards one.
+    """
+    retry = Retry(
+        total=3,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=_RETRY_STATUS_CODES,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=PLAYLIST_FETCH_WORKERS, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
 
 class SpotifyCache:
@@ -129,21 +186,34 @@ class SpotifyExtractor:
         # Rate limiting
         self.last_request_time = 0
         self.min_request_interval = 0.1  # 100ms between requests
+        self._rate_limit_lock = threading.Lock()
     
     def _init_client(self):
         """Initialize Spotify client with Client Credentials flow"""
+        # Persist the access token so repeated runs skip the token request
+        # while it is still valid; without the cache, keep it in memory only
+        if self.cache:
+            cache_handler = CacheFileHandler(cache_path=str(self.cache.cache_dir / "spotify_token.json"))
+        else:
+            cache_handler = MemoryCacheHandler()
+
+        # One keep-alive session for the token and API requests
+        session = _build_http_session()
         auth_manager = SpotifyClientCredentials(
             client_id=self.client_id,
-            client_secret=self.client_secret
+            client_secret=self.client_secret,
+            cache_handler=cache_handler,
+            requests_session=session
         )
-        self.spotify = spotipy.Spotify(auth_manager=auth_manager)
+        self.spotify = spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
     
     def _rate_limit(self):
-        """Ensure we don't exceed rate limits"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
-        self.last_request_time = time.time()
+        """Ensure we don't exceed rate limits (safe to call from worker threads)"""
+        with self._rate_limit_lock:
+            elapsed = time.time() - self.last_request_time
+            if elapsed < self.min_request_interval:
+                time.sleep(self.min_request_interval - elapsed)
+            self.last_request_time = time.time()
     
     def _make_request(self, func, *args, **kwargs):
         """Make rate-limited request with retry logic"""
@@ -176,18 +246,11 @@ class SpotifyExtractor:
     
     def extract_spotify_id(self, url: str, content_type: str) -> str:
         """Extract Spotify ID from URL"""
-        patterns = {
-            'playlist': r'playlist/([a-zA-Z0-9]+)',
-            'album': r'album/([a-zA-Z0-9]+)',
-            'track': r'track/([a-zA-Z0-9]+)',
-            'artist': r'artist/([a-zA-Z0-9]+)'
-        }
-        
-        pattern = patterns.get(content_type)
+        pattern = _SPOTIFY_ID_PATTERNS.get(content_type)
         if not pattern:
             raise ValueError(f"Unsupported content type: {content_type}")
         
-        match = re.search(pattern, url)
+        match = pattern.search(url)
         if match:
             return match.group(1)
         
@@ -210,38 +273,107 @@ class SpotifyExtractor:
             isrc=track_data.get('external_ids', {}).get('isrc')
         )
     
-    def get_playlist_tracks(self, playlist_url: str) -> List[Track]:
-        """Get all tracks from a Spotify playlist (always fetches fresh)"""
+    def _get_playlist_snapshot_id(self, playlist_id: str) -> Optional[str]:
+        """Fetch only the playlist's snapshot_id (changes whenever the playlist is edited)"""
+        try:
+            result = self._make_request(self.spotify.playlist, playlist_id, fields='snapshot_id')
+            return result.get('snapshot_id')
+        except Exception:
+            return None
+
+    def _get_playlist_page(self, playlist_id: str, offset: int) -> Dict:
+        """Fetch one page of playlist items"""
+        return self._make_request(
+            self.spotify.playlist_tracks,
+            playlist_id,
+            offset=offset,
+            limit=PLAYLIST_PAGE_SIZE
+        )
+
+    def _get_cached_playlist(self, playlist_id: str) -> Tuple[Optional[str], Optional[List[Track]]]:
+        """Return the playlist's snapshot cache key and its cached tracks, if any"""
+        if not self.cache:
+            return None, None
+
+        snapshot_id = self._get_playlist_snapshot_id(playlist_id)
+        if not snapshot_id:
+            return None, None
+
+        snapshot_hash = hashlib.sha1(snapshot_id.encode()).hexdigest()[:16]
+        cache_key = f"playlist_{playlist_id}_{snapshot_hash}"
+        cached_data = self.cache.get(cache_key)
+        if not cached_data:
+            return cache_key, None
+
+        print(f"Loaded {len(cached_data)} tracks from cache")
+        return cache_key, [Track(**track_data) for track_data in cached_data]
+
+    def iter_playlist_tracks(self, playlist_url: str) -> Iterator[Track]:
+        """Yield a playlist's tracks, requesting each page only when it is reached.
+
+        Meant for consumers that need a slice (see itertools.islice): pages
+        past the slice are never fetched. Partial listings are not cached.
+        """
         playlist_id = self.extract_spotify_id(playlist_url, 'playlist')
 
-        tracks = []
+        _, cached_tracks = self._get_cached_playlist(playlist_id)
+        if cached_tracks is not None:
+            yield from cached_tracks
+            return
+
         offset = 0
-        limit = 100
+        while True:
+            page = self._get_playlist_page(playlist_id, offset)
+            for item in page['items']:
+                if item['track'] and item['track']['id']:
+                    yield self._track_from_api_data(item['track'])
+
+            offset += PLAYLIST_PAGE_SIZE
+            if offset >= page['total']:
+                return
+
+    def get_playlist_tracks(self, playlist_url: str) -> List[Track]:
+        """Get all tracks from a Spotify playlist.
+
+        Results are cached per playlist snapshot_id, so an edited playlist
+        is always re-fetched while an unchanged one is served from cache.
+        """
+        playlist_id = self.extract_spotify_id(playlist_url, 'playlist')
+
+        cache_key, cached_tracks = self._get_cached_playlist(playlist_id)
+        if cached_tracks is not None:
+            return cached_tracks
 
         print(f"Fetching playlist tracks from Spotify API...")
 
-        while True:
-            try:
-                results = self._make_request(
-                    self.spotify.playlist_tracks,
-                    playlist_id,
-                    offset=offset,
-                    limit=limit
-                )
+        pages = []
+        try:
+            # The first page reports the total, so the rest can be fetched concurrently
+            first_page = self._get_playlist_page(playlist_id, 0)
+            pages.append(first_page)
 
-                for item in results['items']:
-                    if item['track'] and item['track']['id']:
-                        track = self._track_from_api_data(item['track'])
-                        tracks.append(track)
+            offsets = range(PLAYLIST_PAGE_SIZE, first_page['total'], PLAYLIST_PAGE_SIZE)
+            if offsets:
+                with ThreadPoolExecutor(max_workers=PLAYLIST_FETCH_WORKERS) as executor:
+                    # map() yields in offset order and raises at the first failed page
+                    pages.extend(executor.map(
+                        lambda offset: self._get_playlist_page(playlist_id, offset), offsets
+                    ))
 
-                if results['next'] is None:
-                    break
+        except Exception as e:
+            print(f"Error fetching playlist tracks: {e}")
+            # Don't cache a partial listing
+            cache_key = None
 
-                offset += limit
+        tracks = [
+            self._track_from_api_data(item['track'])
+            for page in pages
+            for item in page['items']
+            if item['track'] and item['track']['id']
+        ]
 
-            except Exception as e:
-                print(f"Error fetching playlist tracks: {e}")
-                break
+        if cache_key and tracks:
+            self.cache.set(cache_key, [asdict(track) for track in tracks])
 
         print(f"Found {len(tracks)} tracks in playlist")
         return tracks
@@ -286,7 +418,7 @@ class SpotifyExtractor:
         
         # Cache the results
         if self.cache and tracks:
-            track_data = [track.__dict__ for track in tracks]
+            track_data = [asdict(track) for track in tracks]
             self.cache.set(cache_key, track_data)
         
         print(f"Found {len(tracks)} tracks in album")
@@ -309,7 +441,7 @@ class SpotifyExtractor:
             
             # Cache the result
             if self.cache:
-                self.cache.set(cache_key, [track.__dict__])
+                self.cache.set(cache_key, [asdict(track)])
             
             return track
             
@@ -10,18 +10,21 @@ Handles all Telegram interactions using Telethon including:
 """
 
 import asyncio
+import random
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, Callable, Tuple
 from dataclasses import dataclass
 
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
-from telethon import TelegramClient, events
+from telethon import TelegramClient, events, utils as tl_utils
 
-from .constants import TelegramConstants, MatchingWeights
-from .utils import clear_print, normalize_text, strip_bot_artifacts
+from .constants import TelegramConstants, MatchingWeights, DisplayConstants
+from .rate_limiter import TokenBucket
+from .utils import ainput, clear_print, normalize_text, run_async, strip_bot_artifacts
 from telethon.errors import FloodWaitError, SessionPasswordNeededError
 from telethon.tl.types import (
     DocumentAttributeFilename, 
@@ -35,6 +38,23 @@ from colorama import Fore, Style
 from .spotify_api import Track
 
 
+def _match_key(text: str) -> str:
+    """
+    Normalize text once for fuzzy matching.
+
+    Applies feat./& normalization plus rapidfuzz's default processing
+    (lowercase, punctuation stripped), so scorers can run with no processor.
+
+    Unlike fuzzywuzzy's full_process(force_ascii=True), non-ASCII letters
+    are kept: Cyrillic or CJK titles are scored on their text instead of
+    being reduced to empty strings (which never matched), and accented
+    titles are no longer stripped to fragments. Against
+    CONFIDENCE_THRESHOLD (70), such titles score 100 when they match, and
+    36-57 for another track by the same artist.
+    """
+    return default_process(normalize_text(text))
+
+
 @dataclass
 class TelegramConfig:
     """Configuration for Telegram client"""
@@ -49,6 +69,32 @@ class TelegramConfig:
     response_timeout: int = TelegramConstants.DEFAULT_RESPONSE_TIMEOUT
 
 
+class _ThreadedFileSink:
+    """
+    File-like target for Telethon downloads that writes in a worker thread.
+
+    TelegramClient.download_file awaits write() when it returns an
+    awaitable, so each part is written without blocking the event loop;
+    tell() reports bytes written for the progress callback. Only for
+    download_file: download_media's photo paths call write() without
+    awaiting it.
+    """
+
+    __slots__ = ('_file', '_written')
+
+    def __init__(self, f):
+        self._file = f
+        self._written = 0
+
+    async def write(self, chunk: bytes) -> int:
+        await asyncio.to_thread(self._file.write, chunk)
+        self._written += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._written
+
+
 @dataclass
 class PendingRequest:
     """Represents a pending request to the bot"""
@@ -73,6 +119,19 @@ class TelegramMessenger:
         self.pending_responses: Dict[str, PendingRequest] = {}
         self._pending_lock = asyncio.Lock()
         self.client: Optional[TelegramClient] = None
+        # Bot peer resolved once in _verify_bot; avoids a username lookup per send
+        self._bot_peer = None
+
+        # Paces every message to the bot, shared by concurrent senders
+        self._send_bucket: Optional[TokenBucket] = (
+            TokenBucket.from_interval(config.delay_between_requests)
+            if config.delay_between_requests > 0 else None
+        )
+        # Consecutive flood waits without a successful send in between, and
+        # when the current one ends; concurrent senders hit by the same flood
+        # share that wait instead of counting it again
+        self._flood_wait_streak = 0
+        self._flood_wait_until = 0.0
 
         # Debug mode
         self.debug_mode = False
@@ -81,6 +140,8 @@ class TelegramMessenger:
         self.on_file_downloaded: Optional[Callable] = None
         self.on_download_failed: Optional[Callable] = None
         self.on_bot_response: Optional[Callable] = None
+        # Called (synchronously) whenever Telegram answers a send with a flood wait
+        self.on_flood_wait: Optional[Callable[[], None]] = None
 
     def _clear_print(self, message: str) -> None:
         """Print message after clearing any download progress line"""
@@ -125,16 +186,17 @@ class TelegramMessenger:
         await self.client.send_code_request(self.config.phone_number)
         
         try:
-            code = input(f"{Fore.CYAN}Enter the code you received: {Style.RESET_ALL}")
+            code = await ainput(f"{Fore.CYAN}Enter the code you received: {Style.RESET_ALL}")
             await self.client.sign_in(self.config.phone_number, code)
         except SessionPasswordNeededError:
-            password = input(f"{Fore.CYAN}Two-factor authentication enabled. Enter password: {Style.RESET_ALL}")
+            password = await ainput(f"{Fore.CYAN}Two-factor authentication enabled. Enter password: {Style.RESET_ALL}")
             await self.client.sign_in(password=password)
     
     async def _verify_bot(self):
         """Verify that the external bot exists and is accessible"""
         try:
             bot_entity = await self.client.get_entity(self.config.bot_username)
+            self._bot_peer = tl_utils.get_input_peer(bot_entity)
             print(f"{Fore.GREEN}✓ Found bot: {bot_entity.username}{Style.RESET_ALL}")
         except Exception as e:
             print(f"{Fore.RED}Error: Could not find bot {self.config.bot_username}{Style.RESET_ALL}")
@@ -142,7 +204,7 @@ class TelegramMessenger:
     
     def _setup_event_handlers(self):
         """Set up event handlers for monitoring bot responses"""
-        @self.client.on(events.NewMessage(from_users=self.config.bot_username))
+        @self.client.on(events.NewMessage(from_users=self._bot_peer or self.config.bot_username))
         async def response_handler(event):
             await self._handle_bot_response(event)
     
@@ -197,9 +259,9 @@ class TelegramMessenger:
             for row in event.message.buttons:
                 if isinstance(row, list):
                     for btn in row:
-                        if hasattr(btn, 'text') and btn.text:
+                        if btn.text:
                             parts.append(btn.text)
-                elif hasattr(row, 'text') and row.text:
+                elif row.text:
                     parts.append(row.text)
         return ' '.join(parts)
 
@@ -214,28 +276,27 @@ class TelegramMessenger:
         if not self.pending_responses:
             return None
 
-        best_match = None
-        best_score = 0.0
-        best_request_id = None
+        button_key = _match_key(button_text)
+        choices = {
+            request_id: _match_key(request.track.display_name)
+            for request_id, request in self.pending_responses.items()
+        }
 
-        for request_id, request in self.pending_responses.items():
-            spotify_full = f"{request.track.artist_string} - {request.track.name}"
-            score = fuzz.token_sort_ratio(
-                normalize_text(button_text),
-                normalize_text(spotify_full)
-            )
-
-            if self.debug_mode:
-                print(f"{Fore.MAGENTA}  Button match: {score:.0f}% - {spotify_full}{Style.RESET_ALL}")
-
-            if score > best_score:
-                best_score = score
-                best_match = request
-                best_request_id = request_id
-
-        if best_score >= TelegramConstants.CONFIDENCE_THRESHOLD and best_match:
-            del self.pending_responses[best_request_id]
-            return best_match
+        if self.debug_mode:
+            for _, score, request_id in process.extract(
+                    button_key, choices, scorer=fuzz.token_sort_ratio, limit=None):
+                print(f"{Fore.MAGENTA}  Button match: {score:.0f}% - "
+                      f"{self.pending_responses[request_id].track_name}{Style.RESET_ALL}")
+
+        # score_cutoff lets rapidfuzz reject low-scoring candidates early
+        best = process.extractOne(
+            button_key, choices,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=TelegramConstants.CONFIDENCE_THRESHOLD
+        )
+        if best:
+            _, _, best_request_id = best
+            return self.pending_responses.pop(best_request_id)
 
         # Single pending request — no ambiguity
         if len(self.pending_responses) == 1:
@@ -244,7 +305,7 @@ class TelegramMessenger:
         # Multiple requests, low confidence — don't guess
         if self.debug_mode:
             print(f"{Fore.YELLOW}→ No confident button match among {len(self.pending_responses)} pending "
-                  f"(best: {best_score:.0f}%){Style.RESET_ALL}")
+                  f"(all below {TelegramConstants.CONFIDENCE_THRESHOLD:.0f}%){Style.RESET_ALL}")
         return None
 
     def _find_request_by_reply_id_unlocked(self, reply_to_msg_id: int) -> Optional[PendingRequest]:
@@ -345,9 +406,9 @@ class TelegramMessenger:
             for row_idx, row in enumerate(event.message.buttons):
                 buttons = row if isinstance(row, list) else [row]
                 for btn_idx, btn in enumerate(buttons):
-                    if hasattr(btn, 'text') and btn.text and 'скачать' in btn.text.lower():
+                    if btn.text and 'скачать' in btn.text.lower():
                         try:
-                            await event.message.click(data=btn.data if hasattr(btn, 'data') else None)
+                            await event.message.click(data=btn.data)
                             if self.debug_mode:
                                 self._clear_print(f"{Fore.MAGENTA}DEBUG: Clicked download button: {btn.text}{Style.RESET_ALL}")
                             download_clicked = True
@@ -457,41 +518,49 @@ class TelegramMessenger:
 
         return None
     
-    def _calculate_track_similarity(self, bot_filename: str, bot_metadata: Dict,
+    def _bot_match_keys(self, bot_filename: str, bot_metadata: Dict) -> Dict[str, str]:
+        """Normalize the bot's filename and audio metadata once per response"""
+        keys = {}
+        if bot_filename:
+            # Strip bot-added artifacts (track number prefix, hash suffix) before matching
+            keys['filename'] = _match_key(strip_bot_artifacts(bot_filename))
+        if bot_metadata.get('performer'):
+            keys['performer'] = _match_key(bot_metadata['performer'])
+        if bot_metadata.get('title'):
+            keys['title'] = _match_key(bot_metadata['title'])
+        return keys
+
+    def _calculate_track_similarity(self, bot_keys: Dict[str, str],
                                       spotify_artist: str, spotify_title: str) -> float:
         """
         Calculate similarity score between bot response and Spotify track.
 
         Uses weighted scoring across filename, performer, and title matching.
+        bot_keys comes from _bot_match_keys().
         """
         scores = []
 
-        spotify_artist_clean = normalize_text(spotify_artist)
-        spotify_title_clean = normalize_text(spotify_title)
-        spotify_full = f"{spotify_artist_clean} - {spotify_title_clean}"
+        spotify_artist_clean = _match_key(spotify_artist)
+        spotify_title_clean = _match_key(spotify_title)
+        spotify_full = f"{spotify_artist_clean} {spotify_title_clean}"
 
         # Score 1: Filename vs full track name (most reliable)
-        if bot_filename:
-            # Strip bot-added artifacts (track number prefix, hash suffix) before matching
-            bot_filename_stripped = strip_bot_artifacts(bot_filename)
-            bot_filename_clean = normalize_text(bot_filename_stripped)
-            filename_score = fuzz.token_sort_ratio(bot_filename_clean, spotify_full)
+        if 'filename' in bot_keys:
+            filename_score = fuzz.token_sort_ratio(bot_keys['filename'], spotify_full)
             scores.append(('filename', filename_score, MatchingWeights.FILENAME_WEIGHT))
 
             # Also try just the title part
-            title_score = fuzz.token_sort_ratio(bot_filename_clean, spotify_title_clean)
+            title_score = fuzz.token_sort_ratio(bot_keys['filename'], spotify_title_clean)
             scores.append(('filename_title', title_score, MatchingWeights.FILENAME_TITLE_WEIGHT))
 
         # Score 2: Audio metadata performer vs Spotify artist
-        if bot_metadata.get('performer'):
-            performer_clean = normalize_text(bot_metadata['performer'])
-            performer_score = fuzz.token_sort_ratio(performer_clean, spotify_artist_clean)
+        if 'performer' in bot_keys:
+            performer_score = fuzz.token_sort_ratio(bot_keys['performer'], spotify_artist_clean)
             scores.append(('performer', performer_score, MatchingWeights.PERFORMER_WEIGHT))
 
         # Score 3: Audio metadata title vs Spotify title
-        if bot_metadata.get('title'):
-            title_clean = normalize_text(bot_metadata['title'])
-            title_score = fuzz.token_sort_ratio(title_clean, spotify_title_clean)
+        if 'title' in bot_keys:
+            title_score = fuzz.token_sort_ratio(bot_keys['title'], spotify_title_clean)
             scores.append(('title', title_score, MatchingWeights.TITLE_WEIGHT))
 
         # Calculate weighted average
@@ -519,6 +588,7 @@ class TelegramMessenger:
         best_score = 0.0
         best_request_id = None
         match_details = []
+        bot_keys = self._bot_match_keys(bot_filename, bot_metadata)
 
         # Score all pending requests
         for request_id, request in self.pending_responses.items():
@@ -526,8 +596,7 @@ class TelegramMessenger:
             spotify_title = request.track.name
 
             score = self._calculate_track_similarity(
-                bot_filename, bot_metadata,
-                spotify_artist, spotify_title
+                bot_keys, spotify_artist, spotify_title
             )
 
             match_details.append((request_id, score, f"{spotify_artist} - {spotify_title}"))
@@ -576,13 +645,13 @@ class TelegramMessenger:
             if isinstance(attr, DocumentAttributeFilename):
                 filename = attr.file_name
             elif isinstance(attr, DocumentAttributeAudio):
-                if hasattr(attr, 'title') and attr.title:
+                if attr.title:
                     metadata['title'] = attr.title
                     if not filename:
                         filename = f"{attr.title}.flac"
-                if hasattr(attr, 'performer') and attr.performer:
+                if attr.performer:
                     metadata['performer'] = attr.performer
-                if hasattr(attr, 'duration') and attr.duration:
+                if attr.duration:
                     metadata['duration'] = attr.duration
         
         # Fallback to track name if no filename found
@@ -593,7 +662,7 @@ class TelegramMessenger:
     
     async def send_track_to_bot(self, track: Track) -> bool:
         """
-        Send track URL to external bot with rate limiting.
+        Send track URL to external bot, paced by the shared token bucket.
 
         Args:
             track: The track to send to the bot
@@ -604,13 +673,17 @@ class TelegramMessenger:
         if not self.client:
             raise RuntimeError("Telegram client not initialized")
 
-        track_name = f"{track.artist_string} - {track.name}"
+        track_name = track.display_name
 
         for attempt in range(self.config.max_retries):
             try:
+                # Wait for our slot before sending, rather than sleeping after
+                if self._send_bucket:
+                    await self._send_bucket.acquire()
+
                 # Send message to bot
                 message = await self.client.send_message(
-                    self.config.bot_username,
+                    self._bot_peer or self.config.bot_username,
                     track.url
                 )
 
@@ -626,9 +699,7 @@ class TelegramMessenger:
 
                 self._clear_print(f"{Fore.CYAN}Sent: {track_name}{Style.RESET_ALL}")
 
-                # Rate limiting delay
-                await asyncio.sleep(self.config.delay_between_requests)
-
+                self._flood_wait_streak = 0
                 return True
 
             except FloodWaitError as e:
@@ -638,14 +709,53 @@ class TelegramMessenger:
             except Exception as e:
                 print(f"{Fore.RED}Error sending message (attempt {attempt + 1}): {e}{Style.RESET_ALL}")
                 if attempt < self.config.max_retries - 1:
-                    await asyncio.sleep(5)
+                    # Back off through the bucket so concurrent senders hold off too
+                    backoff = self._retry_backoff(attempt)
+                    if self._send_bucket:
+                        self._send_bucket.penalize(backoff)
+                    else:
+                        await asyncio.sleep(backoff)
                 continue
 
         return False
     
+    @staticmethod
+    def _retry_backoff(attempt: int) -> float:
+        """Exponential backoff with jitter before retrying a failed send.
+
+        Doubles per attempt up to SEND_RETRY_BACKOFF_MAX, then picks a random
+        point in the upper half so concurrent retries do not line up.
+        """
+        ceiling = min(
+            TelegramConstants.SEND_RETRY_BACKOFF * 2 ** attempt,
+            TelegramConstants.SEND_RETRY_BACKOFF_MAX
+        )
+        return random.uniform(ceiling / 2, ceiling)
+
     async def _handle_flood_wait(self, e: FloodWaitError):
-        """Handle Telegram flood wait errors safely"""
-        wait_time = e.seconds * self.config.flood_wait_multiplier
+        """Handle Telegram flood wait errors safely.
+
+        Repeated flood waits back off quadratically (up to a capped streak),
+        and the send bucket is penalized so every concurrent sender pauses,
+        not just this one. Senders hit while a flood wait is already running
+        are part of the same event: they only wait out the remaining time.
+        """
+        remaining = self._flood_wait_until - time.monotonic()
+        if remaining > 0:
+            # Never less than the server asked for this request
+            wait_time = max(remaining, e.seconds)
+            if wait_time > remaining:
+                self._flood_wait_until = time.monotonic() + wait_time
+                if self._send_bucket:
+                    self._send_bucket.penalize(wait_time)
+        else:
+            self._flood_wait_streak = min(self._flood_wait_streak + 1, TelegramConstants.FLOOD_WAIT_MAX_STREAK)
+            wait_time = e.seconds * self.config.flood_wait_multiplier * self._flood_wait_streak ** 2
+            self._flood_wait_until = time.monotonic() + wait_time
+            if self._send_bucket:
+                self._send_bucket.penalize(wait_time)
+            if self.on_flood_wait:
+                self.on_flood_wait()
         print(f"{Fore.YELLOW}Rate limited! Waiting {wait_time:.0f} seconds...{Style.RESET_ALL}")
         
         # Show progress for long waits
@@ -666,22 +776,47 @@ class TelegramMessenger:
         try:
             self._clear_print(f"{Fore.CYAN}Downloading: {filepath.name}{Style.RESET_ALL}")
             
+            last_update = 0.0
+
             def default_progress(current, total):
+                # Telethon reports every chunk; redraw at most a few times per second
+                nonlocal last_update
+                now = time.monotonic()
+                if current < total and now - last_update < DisplayConstants.PROGRESS_UPDATE_INTERVAL:
+                    return
+                last_update = now
+
                 if progress_callback:
                     progress_callback(current, total)
                 else:
                     percent = (current / total) * 100 if total > 0 else 0
                     print(f"\rProgress: {current}/{total} bytes ({percent:.1f}%)", end='')
             
-            # Add timeout for large file downloads
-            await asyncio.wait_for(
-                self.client.download_media(
-                    message,
-                    file=str(filepath),
-                    progress_callback=default_progress
-                ),
-                timeout=self.config.response_timeout  # Use configurable timeout
-            )
+            document = getattr(message, 'document', None)
+            if document is not None:
+                with open(filepath, 'wb') as f:
+                    # Large parts mean fewer GetFile round-trips and writes per file
+                    await asyncio.wait_for(
+                        self.client.download_file(
+                            document,
+                            _ThreadedFileSink(f),
+                            part_size_kb=TelegramConstants.DOWNLOAD_PART_SIZE_KB,
+                            file_size=document.size,
+                            progress_callback=default_progress
+                        ),
+                        timeout=self.config.response_timeout  # Use configurable timeout
+                    )
+            else:
+                # Photo and thumbnail paths write to the file synchronously,
+                # so they get the plain path rather than the threaded sink
+                await asyncio.wait_for(
+                    self.client.download_media(
+                        message,
+                        file=str(filepath),
+                        progress_callback=default_progress
+                    ),
+                    timeout=self.config.response_timeout  # Use configurable timeout
+                )
             
             print()  # New line after progress
             
@@ -710,8 +845,13 @@ class TelegramMessenger:
                 filepath.unlink()
             return False
     
-    async def send_batch_to_bot(self, tracks: list[Track], batch_delay: float = 10.0) -> Dict[str, int]:
-        """Send multiple tracks to bot with batch processing"""
+    async def send_batch_to_bot(self, tracks: list[Track], batch_delay: float = 0.0) -> Dict[str, int]:
+        """
+        Send multiple tracks to bot with batch processing.
+
+        Messages are already spaced by the send bucket; batch_delay only adds
+        extra idle time between tracks when explicitly requested.
+        """
         results = {"success": 0, "failed": 0}
         
         for i, track in enumerate(tracks):
@@ -754,6 +894,17 @@ class TelegramMessenger:
             self._cleanup_expired_requests_unlocked()
             return len(self.pending_responses)
 
+    async def clear_pending(self) -> int:
+        """
+        Drop every pending request, e.g. once a session has nothing left in flight.
+
+        Returns number of dropped requests.
+        """
+        async with self._pending_lock:
+            count = len(self.pending_responses)
+            self.pending_responses.clear()
+            return count
+
     def _cleanup_expired_requests_unlocked(self) -> None:
         """
         Clean up expired pending requests.
@@ -820,9 +971,8 @@ class TelegramMessenger:
             await asyncio.sleep(5)
             pending_count = await self.get_pending_count()
 
-        remaining = await self.get_pending_count()
-        if remaining > 0:
-            print(f"{Fore.YELLOW}Timeout reached. {remaining} responses still pending.{Style.RESET_ALL}")
+        if pending_count > 0:
+            print(f"{Fore.YELLOW}Timeout reached. {pending_count} responses still pending.{Style.RESET_ALL}")
 
 
 def create_telegram_config(api_id: int, api_hash: str, phone_number: str, 
@@ -881,4 +1031,4 @@ if __name__ == "__main__":
         
         await messenger.cleanup()
     
-    asyncio.run(main())
\ No newline at end of file
+    run_async(main())
\ No newline at end of file
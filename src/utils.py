@@ -3,13 +3,38 @@
 Shared Utilities Module
 
 Common utilities used across the spotify_downloader project including:
-- Console output helpers
+- Console output and prompt helpers
 - String normalization and matching
 - Text formatting utilities
+- Filesystem scanning helpers
+- Durable file writes
+- Running coroutines on the fastest available event loop
 """
 
+import asyncio
+import os
+import queue
 import re
-from typing import Optional
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Coroutine, Iterable, Iterator, List, Optional, TextIO
+
+
+# Patterns compiled once at import; these helpers run several times per track
+_FEAT_RE = re.compile(r'\b(?:feat|ft)\.?\b')
+_AUDIO_EXTENSION_RE = re.compile(r'\.(flac|mp3|wav|m4a|ogg)$', re.IGNORECASE)
+_LEADING_TRACK_NUMBER_RE = re.compile(r'^\d{1,3}[-_]')
+_TRAILING_HASH_RE = re.compile(r'[-_]{1,2}[A-Z0-9]{5,7}$')
+
+# Noise removed by normalize_filename, applied in order
+_FILENAME_NOISE_PATTERNS = tuple(re.compile(p) for p in (
+    r'\s*\([^)]*\)\s*',  # Remove parentheses content
+    r'\s*\[[^\]]*\]\s*',  # Remove brackets content
+    r'\s*-\s*copy\s*',    # Remove "copy" indicators
+    r'\s+',               # Normalize whitespace
+))
 
 
 def clear_print(message: str, width: int = 80) -> None:
@@ -26,6 +51,97 @@ def clear_print(message: str, width: int = 80) -> None:
     print(f"\r{' ' * width}\r{message}")
 
 
+class _QueuedStream:
+    """
+    Stand-in for stdout that hands writes to a background thread.
+
+    print() only enqueues text, so callers on the event loop never block on
+    a slow terminal. The writer joins whatever has queued up into a single
+    write and flush, and order is preserved because there is one writer.
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._queue: queue.Queue = queue.Queue()
+        self._failed = False
+        self._thread = threading.Thread(target=self._drain, name='console-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> int:
+        self._queue.put(text)
+        return len(text)
+
+    def flush(self) -> None:
+        """No-op: the writer flushes after every batch, and print(flush=True) must not block"""
+
+    def close(self) -> None:
+        """Write out everything queued, then stop the writer"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def __getattr__(self, name: str):
+        # isatty, encoding, fileno and friends come from the real stream
+        return getattr(self._stream, name)
+
+    def _drain(self) -> None:
+        while True:
+            chunks = [self._queue.get()]
+            while True:
+                try:
+                    chunks.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in chunks
+            try:
+                self._stream.write(''.join(c for c in chunks if c is not None))
+                self._stream.flush()
+            except (OSError, ValueError) as e:
+                # Keep draining so printers never block; say once that output is lost
+                if not self._failed:
+                    self._failed = True
+                    try:
+                        sys.__stderr__.write(f"Warning: console output failed, some lines were dropped: {e}\n")
+                    except (AttributeError, OSError, ValueError):
+                        pass
+            if stop:
+                return
+
+
+async def ainput(prompt: str = '') -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+
+    input() runs in a worker thread, so Telegram pings, reconnects and
+    background tasks keep going while the user reads the prompt.
+
+    Args:
+        prompt: Text shown before reading
+
+    Returns:
+        The line entered, without the trailing newline
+    """
+    return await asyncio.to_thread(input, prompt)
+
+
+@contextmanager
+def queued_stdout() -> Iterator[None]:
+    """
+    Route stdout through a background writer thread for the duration.
+
+    Everything printed inside the block keeps its order; the queue is
+    drained before the original stdout is restored.
+    """
+    original = sys.stdout
+    stream = _QueuedStream(original)
+    sys.stdout = stream
+    try:
+        yield
+    finally:
+        sys.stdout = original
+        stream.close()
+
+
 def normalize_text(text: str) -> str:
     """
     Normalize text for comparison purposes.
@@ -45,16 +161,13 @@ def normalize_text(text: str) -> str:
     result = text.lower()
 
     # Normalize featuring patterns
-    result = re.sub(r'\bfeat\.?\b', 'featuring', result)
-    result = re.sub(r'\bft\.?\b', 'featuring', result)
+    result = _FEAT_RE.sub('featuring', result)
 
     # Normalize ampersand
     result = result.replace('&', 'and')
 
-    # Remove extra whitespace
-    result = re.sub(r'\s+', ' ', result)
-
-    return result.strip()
+    # Remove extra whitespace (split/join collapses and strips in one pass)
+    return ' '.join(result.split())
 
 
 def strip_bot_artifacts(filename: str) -> str:
@@ -69,22 +182,20 @@ def strip_bot_artifacts(filename: str) -> str:
     Strips: leading track number + separator, trailing hash code.
     """
     # Remove file extension
-    result = re.sub(r'\.(flac|mp3|wav|m4a|ogg)$', '', filename, flags=re.IGNORECASE)
+    result = _AUDIO_EXTENSION_RE.sub('', filename)
 
     # Remove leading track number + separator (e.g., "5_", "1-", "20-")
-    result = re.sub(r'^\d{1,3}[-_]', '', result)
+    result = _LEADING_TRACK_NUMBER_RE.sub('', result)
 
     # Remove trailing hash code (5-6 alphanumeric chars after last separator)
     # Matches patterns like _2N3PYW, --9R64DO, _QOOD21, -6SZ50C
-    result = re.sub(r'[-_]{1,2}[A-Z0-9]{5,7}$', '', result)
+    result = _TRAILING_HASH_RE.sub('', result)
 
     # Replace separators with spaces for matching
     result = result.replace('_', ' ').replace('-', ' ')
 
     # Collapse multiple spaces
-    result = re.sub(r'\s+', ' ', result).strip()
-
-    return result
+    return ' '.join(result.split())
 
 
 def normalize_filename(filename: str) -> str:
@@ -106,15 +217,8 @@ def normalize_filename(filename: str) -> str:
     result = filename.lower()
 
     # Remove common patterns
-    patterns_to_remove = [
-        r'\s*\([^)]*\)\s*',  # Remove parentheses content
-        r'\s*\[[^\]]*\]\s*',  # Remove brackets content
-        r'\s*-\s*copy\s*',    # Remove "copy" indicators
-        r'\s+',               # Normalize whitespace
-    ]
-
-    for pattern in patterns_to_remove:
-        result = re.sub(pattern, ' ', result)
+    for pattern in _FILENAME_NOISE_PATTERNS:
+        result = pattern.sub(' ', result)
 
     return result.strip()
 
@@ -201,6 +305,10 @@ def truncate_string(text: str, max_length: int, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+# Invalid filesystem characters plus ASCII control characters, mapped to None
+_SANITIZE_TABLE = str.maketrans('', '', '<>:"/\\|?*' + ''.join(map(chr, range(0x20))) + '\x7f')
+
+
 def sanitize_filename(filename: str, max_length: int = 200) -> str:
     """
     Sanitize a string for use as a filename.
@@ -215,17 +323,129 @@ def sanitize_filename(filename: str, max_length: int = 200) -> str:
     Returns:
         Filesystem-safe filename string
     """
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '')
+    # Drop invalid filesystem and control characters in one pass
+    filename = filename.translate(_SANITIZE_TABLE)
 
-    # Remove control characters
-    filename = re.sub(r'[\x00-\x1f\x7f]', '', filename)
+    # Collapse whitespace, then remove leading/trailing dots and spaces
+    filename = ' '.join(filename.split()).strip('. ')
 
-    # Collapse whitespace
-    filename = re.sub(r'\s+', ' ', filename).strip()
+    return filename[:max_length]
 
-    # Remove leading/trailing dots and spaces
-    filename = filename.strip('. ')
 
-    return filename[:max_length]
+def iter_audio_files(root: str, extensions: Iterable[str]) -> Iterator[str]:
+    """
+    Recursively yield audio file paths under a directory.
+
+    Walks with os.scandir so entries are classified from the directory
+    listing itself, without building Path objects or calling stat() per file.
+    Symlinked directories are not followed.
+
+    Args:
+        root: Directory to walk
+        extensions: Lowercase file extensions to match (e.g. '.flac')
+
+    Yields:
+        Matching file paths as strings
+    """
+    suffixes = tuple(extensions)
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from iter_audio_files(entry.path, suffixes)
+                elif entry.name.lower().endswith(suffixes):
+                    yield entry.path
+    except OSError:
+        return
+
+
+def scan_audio_files(root: str, extensions: Iterable[str], max_workers: int = 8) -> List[str]:
+    """
+    Collect all audio file paths under a directory.
+
+    Top-level subdirectories (typically one per playlist) are walked
+    concurrently, since the work is dominated by directory-listing syscalls.
+
+    Args:
+        root: Directory to walk
+        extensions: File extensions to match (e.g. '.flac')
+        max_workers: Maximum number of concurrent directory walkers
+
+    Returns:
+        List of matching file paths as strings
+    """
+    suffixes = tuple(ext.lower() for ext in extensions)
+    files = []
+    subdirs = []
+
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(suffixes):
+                    files.append(entry.path)
+    except OSError:
+        return files
+
+    if subdirs:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for paths in executor.map(lambda d: list(iter_audio_files(d, suffixes)), subdirs):
+                files.extend(paths)
+
+    return files
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Durably replace a file's contents.
+
+    Writes to a sibling temp file, fsyncs it, then swaps it into place with
+    os.replace, so readers see either the old or the new file, never a
+    partial write.
+
+    Args:
+        path: Destination file path
+        data: Complete new file contents
+    """
+    temp_path = f"{path}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_path, path)
+
+
+def fast_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """
+    Return uvloop's (winloop's on Windows) loop factory when installed.
+
+    Returns:
+        The factory, or None to let asyncio use its default loop
+    """
+    try:
+        if sys.platform == 'win32':
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return None
+
+    return fast_loop.new_event_loop
+
+
+def run_async(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion on the fastest available event loop.
+
+    Args:
+        main: Top-level coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run(main, loop_factory=fast_loop_factory())